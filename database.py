@@ -6,6 +6,9 @@ import threading
 import os
 import shutil
 import time
+import json
+import zlib
+import hashlib
 from typing import List, Dict, Any, Optional, Tuple
 from contextlib import contextmanager
 from utils.logger import app_logger
@@ -18,6 +21,55 @@ class DatabaseError(Exception):
     pass
 
 
+# Memory-mapped I/O window for read-only connections (256 MiB)
+READ_MMAP_SIZE = 256 * 1024 * 1024
+
+# Version prefix for compressed snapshot payloads; plain JSON text rows have no prefix
+SNAPSHOT_BLOB_VERSION = b'\x01'
+
+
+def encode_snapshot_data(snapshot: Dict[str, Any]) -> bytes:
+    """Serialize a snapshot dict to a compressed, versioned blob for storage"""
+    payload = json.dumps(snapshot, separators=(',', ':')).encode('utf-8')
+    return SNAPSHOT_BLOB_VERSION + zlib.compress(payload, 6)
+
+
+def snapshot_digest(blob: bytes) -> str:
+    """Content hash used to skip rewriting unchanged snapshots"""
+    return hashlib.blake2b(blob, digest_size=20).hexdigest()
+
+
+def decode_snapshot_data(raw: Any) -> Any:
+    """Return stored snapshot data as JSON text, decompressing blob rows"""
+    if isinstance(raw, memoryview):
+        raw = raw.tobytes()
+    if isinstance(raw, bytes):
+        if raw[:1] == SNAPSHOT_BLOB_VERSION:
+            return zlib.decompress(raw[1:]).decode('utf-8')
+        return raw.decode('utf-8')
+    return raw
+
+
+class DigestAggregate:
+    """SQLite aggregate: stable blake2b digest over a column, fed row by row"""
+
+    def __init__(self):
+        self._hash = hashlib.blake2b(digest_size=16)
+
+    def step(self, value):
+        if value is not None:
+            # Terminate each value so ('ab', 'c') and ('a', 'bc') differ
+            self._hash.update(str(value).encode('utf-8') + b'\x00')
+
+    def finalize(self):
+        return self._hash.hexdigest()
+
+
+def _register_functions(conn: sqlite3.Connection) -> None:
+    """Register the application's SQL functions on a new connection"""
+    conn.create_aggregate("digest_agg", 1, DigestAggregate)
+
+
 class DatabaseConnection:
     """Thread-safe database connection manager"""
 
@@ -46,6 +98,7 @@ class DatabaseConnection:
                     timeout=30.0
                 )
                 self._local.connection.row_factory = sqlite3.Row
+                _register_functions(self._local.connection)
                 self._local.connection.execute("PRAGMA foreign_keys = ON")
 
                 # Try WAL mode first, fallback to DELETE if needed
@@ -107,6 +160,40 @@ class DatabaseConnection:
         finally:
             cursor.close()
 
+    def get_read_connection(self):
+        """Get this thread's read-only connection, opened once and reused"""
+        if getattr(self._local, 'read_connection', None) is None:
+            try:
+                conn = sqlite3.connect(
+                    f"file:{self.db_path}?mode=ro",
+                    uri=True,
+                    check_same_thread=False,
+                    timeout=30.0
+                )
+                conn.row_factory = sqlite3.Row
+                _register_functions(conn)
+                conn.execute("PRAGMA temp_store=MEMORY")
+                conn.execute(f"PRAGMA mmap_size={READ_MMAP_SIZE}")
+                self._local.read_connection = conn
+            except sqlite3.Error as e:
+                # Database file not created yet; serve reads from the write connection
+                app_logger.warning(f"Read-only connection unavailable, using primary: {e}")
+                return self.get_connection()
+
+        return self._local.read_connection
+
+    @contextmanager
+    def get_read_cursor(self):
+        """Get a cursor for queries that never write; skips the commit round-trip"""
+        cursor = self.get_read_connection().cursor()
+        try:
+            yield cursor
+        except Exception as e:
+            app_logger.error(f"Database read failed: {e}")
+            raise DatabaseError(f"Database read failed: {e}")
+        finally:
+            cursor.close()
+
 
 class DatabaseManager:
     """Database operations manager"""
@@ -329,6 +416,24 @@ class DatabaseManager:
             )
         ''')
 
+        # Migrations for content hash used by snapshot upserts
+        cursor.execute("PRAGMA table_info(project_snapshots)")
+        columns = [column[1] for column in cursor.fetchall()]
+        if 'snapshot_hash' not in columns:
+            cursor.execute('ALTER TABLE project_snapshots ADD COLUMN snapshot_hash TEXT')
+
+        # Metadata columns so listings don't need to parse snapshot_data
+        if 'address' not in columns:
+            cursor.execute('ALTER TABLE project_snapshots ADD COLUMN address TEXT')
+        if 'city' not in columns:
+            cursor.execute('ALTER TABLE project_snapshots ADD COLUMN city TEXT')
+
+        # Tables created by older schema versions lack the UNIQUE constraint needed for ON CONFLICT
+        try:
+            cursor.execute('CREATE UNIQUE INDEX IF NOT EXISTS idx_project_snapshots_project_type ON project_snapshots(project_id, snapshot_type)')
+        except sqlite3.IntegrityError as e:
+            app_logger.warning(f"Duplicate project snapshots prevent unique index creation: {e}")
+
     def _create_team_invitations_table(self, cursor):
         """Create team invitations table"""
         cursor.execute('''
@@ -986,7 +1091,7 @@ class DatabaseManager:
                         'id': result[0],
                         'project_id': result[1],
                         'user_id': result[2],                        'snapshot_type': result[3],
-                        'snapshot_data': result[4],
+                        'snapshot_data': decode_snapshot_data(result[4]),
                         'description': result[5],
                         'created_at': result[6],
                         'updated_at': result[7],
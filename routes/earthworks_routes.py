@@ -117,15 +117,14 @@ class EarthworksRoutes:
         """Register routes with Flask app"""
         self.app = app
 
-        with app.app_context():
-            # Main earthworks calculation API
-            self.app.add_url_rule('/api/calculate-earthworks', 'calculate_earthworks',
-                                 self.handle_calculate_earthworks, methods=['POST'])
+        # Main earthworks calculation API
+        self.app.add_url_rule('/api/calculate-earthworks', 'calculate_earthworks',
+                             self.handle_calculate_earthworks, methods=['POST'])
 
-            app_logger.info(f"✅ Successfully registered: /api/calculate-earthworks")
+        app_logger.info(f"✅ Successfully registered: /api/calculate-earthworks")
 
-            # FFL optimization endpoint
-            self.app.add_url_rule('/api/optimize-ffl', 'optimize_ffl',
-                                 self.handle_optimize_ffl, methods=['POST'])
+        # FFL optimization endpoint
+        self.app.add_url_rule('/api/optimize-ffl', 'optimize_ffl',
+                             self.handle_optimize_ffl, methods=['POST'])
 
-            app_logger.info(f"✅ Successfully registered: /api/optimize-ffl")
+        app_logger.info(f"✅ Successfully registered: /api/optimize-ffl")
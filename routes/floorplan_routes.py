@@ -33,11 +33,12 @@ class FloorplanRoutes:
 
             image_data = data.get('image')
             scale_reference = data.get('scale_reference')
+            return_preview = bool(data.get('return_preview', True))
 
             app_logger.info(f"[FloorPlan] Processing image: data_length={len(image_data) if image_data else 0}, scale_ref={scale_reference}")
 
             # Process the floor plan image
-            result = floorplan_service.process_floorplan_image(image_data, scale_reference)
+            result = floorplan_service.process_floorplan_image(image_data, scale_reference, return_preview)
 
             if result.get('success'):
                 # Store in session for later use
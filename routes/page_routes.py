@@ -68,7 +68,8 @@ class PageRoutes:
                 if project_id and session.get('current_project_id') != str(project_id):
                     app_logger.info(f"Site Developer: Project changed from {session.get('current_project_id')} to {project_id}, clearing cached data")
                     session.pop('site_data', None)
-                    session.pop('terrain_data', None)
+                    session.pop('terrain_snapshot_id', None)
+                    session.pop('unsaved_terrain_id', None)
                     session.pop('floorplan_data', None)
                     session['current_project_id'] = str(project_id)
 
@@ -181,13 +182,13 @@ class PageRoutes:
                     except Exception as e:
                         app_logger.error(f"Error loading FormLab data: {e}")
 
-                # Load terrain data from session or project snapshots
-                terrain_data = session.get('terrain_data', {})
-                
-                # If no terrain data in session, try loading from project snapshots
-                if not terrain_data and project_id:
+                # Load terrain data from project snapshots; the session only holds a terrain handle
+                terrain_data = {}
+                terrain_snapshot_id = session.get('terrain_snapshot_id')
+
+                if project_id or terrain_snapshot_id:
                     try:
-                        from database import DatabaseManager
+                        from database import DatabaseManager, decode_snapshot_data
                         
                         db_manager = DatabaseManager()
                         user_id = session.get('user', {}).get('id')
@@ -195,17 +196,24 @@ class PageRoutes:
                         if user_id:
                             with db_manager.db.get_cursor() as cursor:
                                 # Try terrain_analysis first
-                                cursor.execute("""
-                                    SELECT snapshot_data
-                                    FROM project_snapshots 
-                                    WHERE project_id = ? AND user_id = ? AND snapshot_type = 'terrain_analysis'
-                                    ORDER BY updated_at DESC
-                                    LIMIT 1
-                                """, (project_id, user_id))
+                                if project_id:
+                                    cursor.execute("""
+                                        SELECT snapshot_data
+                                        FROM project_snapshots 
+                                        WHERE project_id = ? AND user_id = ? AND snapshot_type = 'terrain_analysis'
+                                        ORDER BY updated_at DESC
+                                        LIMIT 1
+                                    """, (project_id, user_id))
+                                else:
+                                    cursor.execute("""
+                                        SELECT snapshot_data
+                                        FROM project_snapshots 
+                                        WHERE id = ? AND user_id = ? AND snapshot_type = 'terrain_analysis'
+                                    """, (terrain_snapshot_id, user_id))
                                 
                                 terrain_row = cursor.fetchone()
                                 if terrain_row:
-                                    terrain_snapshot = json.loads(terrain_row[0])
+                                    terrain_snapshot = json.loads(decode_snapshot_data(terrain_row[0]))
                                     # Extract the actual terrain data from the nested structure
                                     if 'terrain_data' in terrain_snapshot:
                                         terrain_data = terrain_snapshot['terrain_data']
@@ -219,12 +227,10 @@ class PageRoutes:
                                     # Validate we have elevation data
                                     if terrain_data and 'elevation_data' in terrain_data:
                                         app_logger.info(f"Loaded terrain data from project {project_id} terrain_analysis snapshots with {len(terrain_data.get('elevation_data', []))} elevation points")
-                                        # Store in session for future use
-                                        session['terrain_data'] = terrain_data
                                     else:
                                         app_logger.warning(f"Terrain snapshot found but no elevation data: {list(terrain_data.keys()) if terrain_data else 'None'}")
                                         terrain_data = {}
-                                else:
+                                elif project_id:
                                     # Fallback: try terrain_data snapshot type
                                     cursor.execute("""
                                         SELECT snapshot_data
@@ -239,13 +245,19 @@ class PageRoutes:
                                         terrain_data = json.loads(fallback_row[0])
                                         if terrain_data and 'elevation_data' in terrain_data:
                                             app_logger.info(f"Loaded terrain data from project {project_id} terrain_data snapshots")
-                                            session['terrain_data'] = terrain_data
                                         else:
                                             app_logger.warning(f"Terrain fallback found but no elevation data")
                                             terrain_data = {}
                     except Exception as e:
                         app_logger.error(f"Failed to load terrain data from project snapshots: {e}")
                         terrain_data = {}
+
+                # Terrain generated without a saved project snapshot is held in memory instead
+                if not terrain_data and session.get('unsaved_terrain_id'):
+                    from routes.terrain_routes import get_unsaved_terrain
+                    terrain_data = get_unsaved_terrain(session['unsaved_terrain_id']) or {}
+                    if terrain_data:
+                        app_logger.info("Loaded unsaved terrain data for Site Developer")
                 
                 # Always try to load terrain data, even if site_data is empty
                 # This allows viewing terrain analysis results independently
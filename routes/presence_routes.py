@@ -30,9 +30,9 @@ def require_auth(f):
         return f(*args, **kwargs)
     return decorated_function
 
-def cleanup_expired_presence():
+def cleanup_expired_presence(current_time=None):
     """Clean up expired presence records"""
-    current_time = datetime.now()
+    current_time = current_time or datetime.now()
     expired_keys = []
     
     for key, data in active_presence.items():
@@ -57,8 +57,12 @@ def presence_heartbeat():
         project_id = data['project_id']
         user_id = session['user']['id']
         
+        # One clock read per heartbeat, formatted once and reused in every response
+        now = datetime.now()
+        now_iso = now.isoformat()
+
         # Clean up expired presence
-        cleanup_expired_presence()
+        cleanup_expired_presence(now)
         
         # Update user presence
         presence_key = f"{project_id}:{user_id}"
@@ -67,7 +71,8 @@ def presence_heartbeat():
             'project_id': project_id,
             'username': session['user']['username'],
             'profile_picture': session['user'].get('profile_picture', ''),
-            'last_seen': datetime.now()
+            'last_seen': now,
+            'last_seen_iso': now_iso
         }
         
         # Get all active users for this project
@@ -78,7 +83,7 @@ def presence_heartbeat():
                     'id': presence['user_id'],
                     'username': presence['username'],
                     'profile_picture': presence['profile_picture'],
-                    'last_seen': presence['last_seen'].isoformat()
+                    'last_seen': presence['last_seen_iso']
                 })
         
         logger.info(f"Presence heartbeat from user {user_id} for project {project_id}")
@@ -86,7 +91,7 @@ def presence_heartbeat():
         return jsonify({
             'success': True,
             'active_users': active_users,
-            'timestamp': datetime.now().isoformat()
+            'timestamp': now_iso
         })
         
     except Exception as e:
@@ -111,7 +116,7 @@ def get_project_presence(project_id):
                     'id': presence['user_id'],
                     'username': presence['username'],
                     'profile_picture': presence['profile_picture'],
-                    'last_seen': presence['last_seen'].isoformat()
+                    'last_seen': presence['last_seen_iso']
                 })
         
         logger.info(f"Retrieved {len(active_users)} active users for project {project_id}")
@@ -1,10 +1,17 @@
 """The code changes focus on saving and loading structure placement data within the terrain routes module to ensure it's persisted during cut and fill analysis."""
 import json
 import math
-from flask import request, jsonify, render_template, session
+import time
+import threading
+import uuid
+import numpy as np
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from concurrent.futures import ThreadPoolExecutor
+from flask import Response, request, jsonify, render_template, session
 from utils.logger import app_logger
-from typing import Dict, Any
-from datetime import datetime
+from typing import Dict, Any, Optional, Tuple
 
 # Try to import terrain service with graceful fallback
 try:
@@ -16,6 +23,318 @@ except ImportError as e:
     terrain_service = None
     TERRAIN_AVAILABLE = False
 
+METRES_PER_DEGREE_LAT = 111320.0
+
+
+def _square_bounds(lat: float, lng: float, half_size_m: float = 50.0):
+    """Build a closed square boundary and buffered terrain bounds around a point"""
+    lat_offset = half_size_m / METRES_PER_DEGREE_LAT
+    lng_offset = half_size_m / (METRES_PER_DEGREE_LAT * math.cos(math.radians(lat)))
+    west, east = lng - lng_offset, lng + lng_offset
+    south, north = lat - lat_offset, lat + lat_offset
+
+    coordinates = [
+        [west, south],  # Southwest
+        [east, south],  # Southeast
+        [east, north],  # Northeast
+        [west, north],  # Northwest
+        [west, south]   # Close polygon
+    ]
+
+    # Terrain bounds extend the boundary by the same offset again on each side
+    terrain_bounds = {
+        'southwest': [west - lng_offset, south - lat_offset],
+        'northeast': [east + lng_offset, north + lat_offset],
+        'center': [lng, lat],
+        'width': lng_offset * 4,
+        'height': lat_offset * 4
+    }
+
+    return coordinates, terrain_bounds
+
+
+# Nominatim usage policy allows roughly one request per second across the whole process
+NOMINATIM_MIN_INTERVAL = 1.0
+_nominatim_lock = threading.Lock()
+_nominatim_last_request = 0.0
+
+
+def _wait_for_nominatim_slot() -> None:
+    """Block until the next Nominatim request is allowed by the shared rate limit"""
+    global _nominatim_last_request
+    with _nominatim_lock:
+        wait = _nominatim_last_request + NOMINATIM_MIN_INTERVAL - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+        _nominatim_last_request = time.monotonic()
+
+
+class _NominatimRetry(Retry):
+    """Retry policy whose attempts also take a slot from the shared Nominatim rate limit"""
+
+    def sleep(self, response=None) -> None:
+        # urllib3 gives the first retry no backoff, so without this a 429 is retried immediately
+        super().sleep(response)
+        _wait_for_nominatim_slot()
+
+
+# Shared Nominatim session so repeated geocodes reuse pooled connections and
+# transient throttling/gateway errors are retried with backoff
+NOMINATIM_SEARCH_URL = "https://nominatim.openstreetmap.org/search"
+_geo_session = requests.Session()
+_geo_session.mount('https://', HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=8,
+    max_retries=_NominatimRetry(
+        total=3,
+        backoff_factor=0.5,
+        status_forcelist=(429, 502, 503, 504),
+        allowed_methods=frozenset({'GET'}),
+        respect_retry_after_header=True,
+        raise_on_status=False  # Hand the final response to raise_for_status for 403/429 handling
+    )
+))
+_geo_session.headers.update({
+    'User-Agent': 'EngineRoom-Terrain-Service/1.0 (engineering@engineroom.nz)',
+    'Accept': 'application/json',
+    'Accept-Language': 'en'
+})
+
+
+def _nominatim_geocode(address: str) -> Optional[Tuple[float, float]]:
+    """Geocode a New Zealand address with Nominatim, returning (lat, lng) or None"""
+    params = {
+        'q': address,
+        'format': 'json',
+        'limit': 1,
+        'bounded': 1,
+        'countrycodes': 'nz'  # Restrict to New Zealand
+    }
+
+    # Space requests out to respect rate limits; the network round trip itself is not serialised
+    _wait_for_nominatim_slot()
+
+    response = _geo_session.get(NOMINATIM_SEARCH_URL, params=params, timeout=15)
+    response.raise_for_status()
+
+    results = response.json()
+    if not results:
+        return None
+    return float(results[0]['lat']), float(results[0]['lon'])
+
+
+# Upper bounds for the multi-address endpoint
+MAX_BATCH_ADDRESSES = 10
+GEOCODE_WORKERS = 4
+
+
+# In-process geocode results keyed by normalised address
+GEOCODE_CACHE_SIZE = 512
+_geocode_cache: Dict[str, Tuple[float, float]] = {}
+_geocode_cache_lock = threading.Lock()
+
+
+def _normalize_address(address: str) -> str:
+    """Normalise an address for cache lookups"""
+    return ' '.join(address.lower().replace(',', ' ').split())
+
+
+def _cache_geocode(address: str, lat: float, lng: float) -> None:
+    """Remember a geocoded address, evicting the oldest entry when full"""
+    key = _normalize_address(address)
+    # Geocode workers and concurrent requests insert at once; evict and insert as one step
+    with _geocode_cache_lock:
+        _geocode_cache.pop(key, None)
+        while len(_geocode_cache) >= GEOCODE_CACHE_SIZE:
+            _geocode_cache.pop(next(iter(_geocode_cache)))
+        _geocode_cache[key] = (lat, lng)
+
+
+def _local_geocode(address: str, project_id=None, user_id=None) -> Optional[Tuple[float, float]]:
+    """Resolve an address without a network call from the cache or stored project coordinates"""
+    key = _normalize_address(address)
+    hit = _geocode_cache.get(key)
+    if hit:
+        return hit
+
+    if not (project_id and user_id):
+        return None
+
+    try:
+        from database import DatabaseManager
+        db_manager = DatabaseManager()
+        with db_manager.db.get_cursor() as cursor:
+            cursor.execute("""
+                SELECT address, location_lat, location_lng
+                FROM projects
+                WHERE id = ? AND user_id = ?
+            """, (project_id, user_id))
+            row = cursor.fetchone()
+    except Exception as e:
+        app_logger.warning(f"Local geocode lookup failed for project {project_id}: {e}")
+        return None
+
+    if row and row[1] is not None and row[2] is not None and _normalize_address(row[0] or '') == key:
+        lat, lng = float(row[1]), float(row[2])
+        _cache_geocode(address, lat, lng)
+        return lat, lng
+    return None
+
+
+def _address_site_data(address: str, lat: float, lng: float) -> Dict[str, Any]:
+    """Build the terrain site data payload for a geocoded address"""
+    # Create a small boundary around the geocoded point (approximately 50m x 50m)
+    coordinates, terrain_bounds = _square_bounds(lat, lng)
+
+    # Create site data for terrain generation
+    site_data = {
+        'coordinates': coordinates,
+        'address': address,
+        'center_lat': lat,
+        'center_lng': lng,
+        'area_m2': 2500,  # 50m x 50m
+        'terrainBounds': terrain_bounds,
+        'geocoded_from_address': True,
+        'original_address': address
+    }
+
+    return {
+        'success': True,
+        'site_data': site_data,
+        'coordinates': coordinates,
+        'center': [lng, lat],
+        'terrain_bounds': terrain_bounds
+    }
+
+
+# Background terrain jobs: generation runs off the request thread and clients poll for the result
+TERRAIN_JOB_WORKERS = 2
+TERRAIN_JOB_TTL = 600  # Seconds a finished job stays available for polling
+_terrain_executor = ThreadPoolExecutor(max_workers=TERRAIN_JOB_WORKERS, thread_name_prefix='terrain-job')
+_terrain_jobs: Dict[str, Dict[str, Any]] = {}
+_terrain_jobs_lock = threading.Lock()
+
+
+def _prune_terrain_jobs() -> None:
+    """Forget finished jobs that have not been collected within the TTL"""
+    cutoff = time.monotonic() - TERRAIN_JOB_TTL
+    with _terrain_jobs_lock:
+        expired = [job_id for job_id, job in _terrain_jobs.items()
+                   if job['finished_at'] is not None and job['finished_at'] < cutoff]
+        for job_id in expired:
+            del _terrain_jobs[job_id]
+
+
+def _submit_terrain_job(generate, site_data, address, project_id, user_id) -> str:
+    """Queue terrain generation on the worker pool and return the job id"""
+    _prune_terrain_jobs()
+    job_id = uuid.uuid4().hex
+    job = {
+        'user_id': user_id,
+        'status': 'queued',
+        'progress': {},
+        'result': None,
+        'snapshot_id': None,
+        'unsaved_id': None,
+        'finished_at': None
+    }
+    with _terrain_jobs_lock:
+        _terrain_jobs[job_id] = job
+
+    def run():
+        job['status'] = 'running'
+        try:
+            result, snapshot_id, unsaved_id = generate(site_data, address, project_id, user_id, job['progress'])
+            job['snapshot_id'] = snapshot_id
+            job['unsaved_id'] = unsaved_id
+            job['result'] = result
+            job['status'] = 'completed' if result.get('success') else 'failed'
+        except Exception as e:
+            app_logger.error(f"Terrain job {job_id} failed: {e}")
+            job['result'] = {'success': False, 'error': f'Server error: {str(e)}'}
+            job['status'] = 'failed'
+        finally:
+            job['finished_at'] = time.monotonic()
+
+    _terrain_executor.submit(run)
+    return job_id
+
+
+# Terrain generated without a saved project (or without a login) has no snapshot row; it is
+# kept here instead so Site Developer can still show it, keyed by a handle held in the session
+UNSAVED_TERRAIN_TTL = 3600  # Seconds an unsaved terrain result stays available
+UNSAVED_TERRAIN_MAX = 32
+_unsaved_terrain: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+_unsaved_terrain_lock = threading.Lock()
+
+
+def _store_unsaved_terrain(result: Dict[str, Any]) -> str:
+    """Keep a terrain result that has no snapshot row, returning its handle"""
+    terrain_id = uuid.uuid4().hex
+    now = time.monotonic()
+    with _unsaved_terrain_lock:
+        for expired_id in [key for key, (stored_at, _) in _unsaved_terrain.items()
+                           if stored_at < now - UNSAVED_TERRAIN_TTL]:
+            del _unsaved_terrain[expired_id]
+        _unsaved_terrain[terrain_id] = (now, result)
+        # Insertion order is age order, so the oldest entry goes first
+        while len(_unsaved_terrain) > UNSAVED_TERRAIN_MAX:
+            del _unsaved_terrain[next(iter(_unsaved_terrain))]
+    return terrain_id
+
+
+def get_unsaved_terrain(terrain_id: Optional[str]) -> Optional[Dict[str, Any]]:
+    """Terrain result stored by _store_unsaved_terrain, or None if unknown or expired"""
+    if not terrain_id:
+        return None
+    with _unsaved_terrain_lock:
+        entry = _unsaved_terrain.get(terrain_id)
+    if entry is None or entry[0] < time.monotonic() - UNSAVED_TERRAIN_TTL:
+        return None
+    return entry[1]
+
+
+def _remember_terrain(snapshot_id: Optional[int], unsaved_id: Optional[str]) -> None:
+    """Point the session at the latest terrain: its snapshot row, or else the unsaved copy"""
+    session.pop('terrain_snapshot_id', None)
+    session.pop('unsaved_terrain_id', None)
+    if snapshot_id:
+        session['terrain_snapshot_id'] = snapshot_id
+    elif unsaved_id:
+        session['unsaved_terrain_id'] = unsaved_id
+
+
+# Snapshot precision: centimetres for terrain grids, ~10 cm for lng/lat coordinates
+GRID_DECIMALS = 2
+COORDINATE_DECIMALS = 6
+GRID_KEYS = ('elevation_data', 'x_coords', 'y_coords')
+
+
+def _quantize(value: Any, ndigits: int) -> Any:
+    """Recursively round floats in nested dicts/lists"""
+    if isinstance(value, float):
+        return round(value, ndigits)
+    if isinstance(value, (list, tuple)):
+        return [_quantize(item, ndigits) for item in value]
+    if isinstance(value, dict):
+        return {key: _quantize(item, ndigits) for key, item in value.items()}
+    return value
+
+
+def _quantize_terrain_result(result: Dict[str, Any]) -> Dict[str, Any]:
+    """Return a copy of a terrain result with reduced precision for persistence"""
+    quantized = dict(result)
+    for key in GRID_KEYS:
+        grid = result.get(key)
+        if grid:
+            quantized[key] = np.round(np.asarray(grid, dtype=float), GRID_DECIMALS).tolist()
+    if 'boundary_coords' in result:
+        quantized['boundary_coords'] = _quantize(result['boundary_coords'], GRID_DECIMALS)
+    for key in ('polygon_overlays', 'coordinates', 'terrain_bounds'):
+        if key in result:
+            quantized[key] = _quantize(result[key], COORDINATE_DECIMALS)
+    return quantized
+
 
 class TerrainRoutes:
     """Terrain route handlers"""
@@ -48,7 +367,8 @@ class TerrainRoutes:
                     if session.get('current_project_id') != project_id:
                         app_logger.info(f"Project changed from {session.get('current_project_id')} to {project_id}, clearing cached data")
                         session.pop('site_data', None)
-                        session.pop('terrain_data', None)
+                        session.pop('terrain_snapshot_id', None)
+                        session.pop('unsaved_terrain_id', None)
                         session.pop('floorplan_data', None)
                     # Store current project ID in session
                     session['current_project_id'] = project_id
@@ -168,7 +488,7 @@ class TerrainRoutes:
     def _load_site_data_from_project(self, project_id):
         """Load site boundary, setbacks, and structure data from project snapshots"""
         try:
-            from database import DatabaseManager
+            from database import DatabaseManager, decode_snapshot_data
             import json
 
             db_manager = DatabaseManager()
@@ -181,11 +501,12 @@ class TerrainRoutes:
             site_data = {}
 
             with db_manager.db.get_cursor() as cursor:
-                # Load all snapshots for this project
+                # Load only the snapshot types used here, skipping large terrain payloads
                 cursor.execute("""
                     SELECT snapshot_type, snapshot_data, updated_at
                     FROM project_snapshots 
                     WHERE project_id = ? AND user_id = ?
+                      AND snapshot_type IN ('site_boundary', 'buildable_area', 'structure_placement')
                     ORDER BY updated_at DESC
                 """, (project_id, user_id))
 
@@ -199,6 +520,7 @@ class TerrainRoutes:
                 for snapshot_type, snapshot_data, updated_at in snapshots:
                     try:
                         # Parse snapshot data
+                        snapshot_data = decode_snapshot_data(snapshot_data)
                         if isinstance(snapshot_data, str):
                             data = json.loads(snapshot_data)
                         else:
@@ -343,7 +665,7 @@ class TerrainRoutes:
 
                     # Convert 50m buffer to degrees
                     lat_buffer = 50 / 111320  # ~0.00045 degrees
-                    lng_buffer = 50 / (111320 * math.cos((min_lat + max_lat) / 2 * math.pi / 180))
+                    lng_buffer = 50 / (111320 * math.cos(math.radians((min_lat + max_lat) / 2)))
 
                     site_data['terrainBounds'] = {
                         'southwest': [min_lng - lng_buffer, min_lat - lat_buffer],
@@ -429,7 +751,8 @@ class TerrainRoutes:
             if session.get('current_project_id') != str(project_id):
                 app_logger.info(f"Clearing cached data - project changed to {project_id}")
                 session.pop('site_data', None)
-                session.pop('terrain_data', None)
+                session.pop('terrain_snapshot_id', None)
+                session.pop('unsaved_terrain_id', None)
                 session.pop('floorplan_data', None)
 
             # Update current project ID
@@ -592,108 +915,49 @@ class TerrainRoutes:
 
             address = site_data.get('address', 'Unknown location')
 
-            # Log available polygon data for terrain visualization
-            polygon_info = []
-            if site_data.get('coordinates'):
-                polygon_info.append(f"Site boundary ({len(site_data['coordinates'])} points)")
-            if site_data.get('buildable_area', {}).get('coordinates'):
-                polygon_info.append(f"Buildable area ({len(site_data['buildable_area']['coordinates'])} points)")
-            if site_data.get('structure_placement', {}).get('coordinates'):
-                polygon_info.append(f"Structure placement ({len(site_data['structure_placement']['coordinates'])} points)")
-
-            if polygon_info:
-                app_logger.info(f"Starting terrain generation for site: {address} with polygons: {', '.join(polygon_info)}")
-            else:
-                app_logger.info(f"Starting terrain generation for site: {address}")
-
-            # Progress tracking storage
-            progress_data = {
-                'current_step': 1,
-                'message': 'Starting...',
-                'percentage': 0,
-                'steps_completed': []
-            }
-
-            def progress_callback(step: int, message: str, percentage: int = None):
-                """Progress callback to track generation status"""
-                progress_data['current_step'] = step
-                progress_data['message'] = message
-                if percentage is not None:
-                    progress_data['percentage'] = min(100, max(0, percentage))
-                if step not in progress_data['steps_completed']:
-                    progress_data['steps_completed'].append(step)
-                app_logger.info(f"Progress Step {step}: {message} ({progress_data['percentage']}%)")
-
-            # Generate terrain data with progress tracking
-            result = terrain_service.generate_terrain_data(site_data, progress_callback)
-
-            # Add final progress info to result
-            if result.get('success'):
-                result['progress'] = {
-                    'completed': True,
-                    'final_step': progress_data['current_step'],
-                    'final_message': progress_data['message'],
-                    'percentage': 100
-                }
-                app_logger.info(f"Terrain data generated successfully for {address}")
-
-                # Store terrain data in session for Site Developer page
-                session['terrain_data'] = result
-                app_logger.info("Terrain data stored in session for Site Developer page")
-
-                # Get project_id from request data first, then session as fallback
-                request_project_id = data.get('project_id')
-                session_project_id = session.get('current_project_id')
+            # Log available polygon data for terrain visualization (skipped when INFO is disabled)
+            if app_logger.is_enabled_for('INFO'):
+                polygon_info = []
+                if site_data.get('coordinates'):
+                    polygon_info.append(f"Site boundary ({len(site_data['coordinates'])} points)")
+                if site_data.get('buildable_area', {}).get('coordinates'):
+                    polygon_info.append(f"Buildable area ({len(site_data['buildable_area']['coordinates'])} points)")
+                if site_data.get('structure_placement', {}).get('coordinates'):
+                    polygon_info.append(f"Structure placement ({len(site_data['structure_placement']['coordinates'])} points)")
 
-                # Use request project_id if available, otherwise use session
-                project_id = request_project_id or session_project_id
+                if polygon_info:
+                    app_logger.info(f"Starting terrain generation for site: {address} with polygons: {', '.join(polygon_info)}")
+                else:
+                    app_logger.info(f"Starting terrain generation for site: {address}")
 
-                app_logger.info(f"Saving terrain data - request project_id: {request_project_id}, session project_id: {session_project_id}, using: {project_id}")
+            # Get project_id from request data first, then session as fallback
+            request_project_id = data.get('project_id')
+            session_project_id = session.get('current_project_id')
+            project_id = request_project_id or session_project_id
+            user_id = session.get('user', {}).get('id')
+            app_logger.info(f"Terrain project - request project_id: {request_project_id}, session project_id: {session_project_id}, using: {project_id}")
 
-                if project_id:
+            if data.get('async'):
+                # The worker thread has no request context, so resolve session-held structure data now
+                if not site_data.get('structure_placement', {}).get('coordinates') and session.get('structure_placement_data'):
                     try:
-                        from database import DatabaseManager
-                        import json
-
-                        db_manager = DatabaseManager()
-                        user_id = session.get('user', {}).get('id')
-
-                        if user_id:
-                            terrain_snapshot = {
-                                'terrain_data': result,
-                                'elevation_data': result.get('elevation_data', []),
-                                'polygon_overlays': result.get('polygon_overlays', {}),
-                                'mapbox_tile_url': result.get('mapbox_tile_url'),
-                                'terrain_bounds': result.get('terrain_bounds'),
-                                'coordinates': result.get('coordinates', {}),
-                                'city': result.get('city', ''),
-                                'address': result.get('address', ''),
-                                'timestamp': datetime.now().isoformat()
-                            }
+                        site_data['structure_placement'] = json.loads(session['structure_placement_data'])
+                    except (TypeError, ValueError):
+                        pass
 
-                            with db_manager.db.get_cursor() as cursor:
-                                cursor.execute("""
-                                    INSERT OR REPLACE INTO project_snapshots 
-                                    (project_id, user_id, snapshot_type, snapshot_data, description)
-                                    VALUES (?, ?, ?, ?, ?)
-                                """, (
-                                    project_id, user_id, 'terrain_analysis',
-                                    json.dumps(terrain_snapshot),
-                                    f'Terrain analysis for {address}'
-                                ))
-
-                            app_logger.info(f"Terrain data saved to project {project_id} snapshots")
-                    except Exception as e:
-                        app_logger.error(f"Failed to save terrain data to project snapshots: {e}")
+                job_id = _submit_terrain_job(self._generate_and_save_terrain, site_data, address, project_id, user_id)
+                app_logger.info(f"Queued terrain generation job {job_id} for {address}")
+                return jsonify({
+                    'success': True,
+                    'job_id': job_id,
+                    'status': 'queued'
+                }), 202
 
-            else:
-                result['progress'] = {
-                    'completed': False,
-                    'failed_at_step': progress_data['current_step'],
-                    'error_message': progress_data['message'],
-                    'percentage': progress_data['percentage']
-                }
-                app_logger.error(f"Terrain generation failed for {address}: {result.get('error')}")
+            result, snapshot_id, unsaved_id = self._generate_and_save_terrain(site_data, address, project_id, user_id, {})
+
+            # Keep only a handle in the session; Site Developer loads the terrain on demand
+            if result.get('success'):
+                _remember_terrain(snapshot_id, unsaved_id)
 
             return jsonify(result)
 
@@ -709,60 +973,232 @@ class TerrainRoutes:
                 }
             }), 500
 
-    def register_routes(self, app):
-        """Register routes with Flask app"""
-        self.app = app
-        self.total_routes = 0
+    def _generate_and_save_terrain(self, site_data, address, project_id, user_id, progress_data):
+        """Run terrain generation and persist the snapshot; safe to call outside a request.
+
+        Returns (result, snapshot_id, unsaved_id): terrain that could not be saved to a
+        project snapshot is kept in the unsaved terrain store instead.
+        """
+        # Progress tracking storage
+        progress_data.update({
+            'current_step': 1,
+            'message': 'Starting...',
+            'percentage': 0,
+            'steps_completed': []
+        })
+        steps_seen = set()
+
+        def progress_callback(step: int, message: str, percentage: int = None):
+            """Progress callback to track generation status"""
+            progress_data['current_step'] = step
+            progress_data['message'] = message
+            if percentage is not None:
+                progress_data['percentage'] = min(100, max(0, percentage))
+            if step not in steps_seen:
+                steps_seen.add(step)
+                progress_data['steps_completed'].append(step)
+            app_logger.info(f"Progress Step {step}: {message} ({progress_data['percentage']}%)")
+
+        # Generate terrain data with progress tracking
+        result = terrain_service.generate_terrain_data(site_data, progress_callback)
+        snapshot_id = None
+        unsaved_id = None
+
+        # Add final progress info to result
+        if result.get('success'):
+            result['progress'] = {
+                'completed': True,
+                'final_step': progress_data['current_step'],
+                'final_message': progress_data['message'],
+                'percentage': 100
+            }
+            app_logger.info(f"Terrain data generated successfully for {address}")
+
+            if project_id and user_id:
+                snapshot_id = self._save_terrain_snapshot(result, address, project_id, user_id)
+            if snapshot_id is None:
+                unsaved_id = _store_unsaved_terrain(result)
+        else:
+            result['progress'] = {
+                'completed': False,
+                'failed_at_step': progress_data['current_step'],
+                'error_message': progress_data['message'],
+                'percentage': progress_data['percentage']
+            }
+            app_logger.error(f"Terrain generation failed for {address}: {result.get('error')}")
 
-        with app.app_context():
-            self.app.add_url_rule('/terrain-viewer', 'terrain_viewer', 
-                                 self.handle_terrain_viewer, methods=['GET'])
+        return result, snapshot_id, unsaved_id
 
-            app_logger.info(f"✅ Successfully registered: /terrain-viewer")
+    def _save_terrain_snapshot(self, result, address, project_id, user_id):
+        """Upsert the terrain analysis snapshot for a project, returning its row id"""
+        try:
+            from database import DatabaseManager, encode_snapshot_data, snapshot_digest
 
-            # Main terrain generation API
-            self.app.add_url_rule('/api/generate-terrain', 'generate_terrain',
-                                 self.handle_generate_terrain, methods=['POST'])
+            db_manager = DatabaseManager()
+            stored_result = _quantize_terrain_result(result)
+            # Generation time is tracked by the row's updated_at, keeping the
+            # payload (and its hash) identical for identical terrain
+            terrain_snapshot = {
+                'terrain_data': stored_result,
+                'elevation_data': stored_result.get('elevation_data', []),
+                'polygon_overlays': stored_result.get('polygon_overlays', {}),
+                'mapbox_tile_url': stored_result.get('mapbox_tile_url'),
+                'terrain_bounds': stored_result.get('terrain_bounds'),
+                'coordinates': stored_result.get('coordinates', {}),
+                'city': stored_result.get('city', ''),
+                'address': stored_result.get('address', '')
+            }
+            snapshot_blob = encode_snapshot_data(terrain_snapshot)
 
-            app_logger.info(f"✅ Successfully registered: /api/generate-terrain")
+            with db_manager.db.get_cursor() as cursor:
+                # Only rewrite the row when the terrain payload actually changed
+                cursor.execute("""
+                    INSERT INTO project_snapshots 
+                    (project_id, user_id, snapshot_type, snapshot_data, description, snapshot_hash,
+                     address, city, created_at, updated_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
+                    ON CONFLICT(project_id, snapshot_type) DO UPDATE SET
+                        user_id = excluded.user_id,
+                        snapshot_data = excluded.snapshot_data,
+                        description = excluded.description,
+                        snapshot_hash = excluded.snapshot_hash,
+                        address = excluded.address,
+                        city = excluded.city,
+                        updated_at = CURRENT_TIMESTAMP
+                    WHERE project_snapshots.snapshot_hash IS NOT excluded.snapshot_hash
+                """, (
+                    project_id, user_id, 'terrain_analysis',
+                    snapshot_blob,
+                    f'Terrain analysis for {address}',
+                    snapshot_digest(snapshot_blob),
+                    terrain_snapshot['address'],
+                    terrain_snapshot['city']
+                ))
+                cursor.execute("""
+                    SELECT id FROM project_snapshots
+                    WHERE project_id = ? AND snapshot_type = 'terrain_analysis'
+                """, (project_id,))
+                snapshot_id = cursor.fetchone()[0]
 
-            # Terrain cache management routes
-            self.app.add_url_rule('/api/terrain-cache-stats', 'terrain_cache_stats',
-                                 self.handle_terrain_cache_stats, methods=['GET'])
+            app_logger.info(f"Terrain data saved to project {project_id} snapshots (snapshot {snapshot_id})")
+            return snapshot_id
 
-            app_logger.info(f"✅ Successfully registered: /api/terrain-cache-stats")
+        except Exception as e:
+            app_logger.error(f"Failed to save terrain data to project snapshots: {e}")
+            return None
 
-            self.app.add_url_rule('/api/clear-terrain-cache', 'clear_terrain_cache',
-                                 self.handle_clear_terrain_cache, methods=['POST'])
+    def handle_terrain_job(self, job_id: str):
+        """Report the status of a background terrain job, including its result once finished"""
+        _prune_terrain_jobs()
+        with _terrain_jobs_lock:
+            job = _terrain_jobs.get(job_id)
+            if job and job['user_id'] == session.get('user', {}).get('id'):
+                status = job['status']
+                progress = dict(job['progress'], steps_completed=list(job['progress'].get('steps_completed', [])))
+                result = job['result']
+                snapshot_id = job['snapshot_id']
+                unsaved_id = job['unsaved_id']
+            else:
+                job = None
 
-            app_logger.info(f"✅ Successfully registered: /api/clear-terrain-cache")
+        if not job:
+            return jsonify({
+                'success': False,
+                'error': 'Terrain job not found'
+            }), 404
 
-            # Site data loading for terrain analysis
-            self.app.add_url_rule('/api/load-site-data', 'load_site_data',
-                                 self.handle_load_site_data, methods=['POST'])
+        response = {
+            'success': True,
+            'job_id': job_id,
+            'status': status,
+            'progress': progress
+        }
 
-            app_logger.info(f"✅ Successfully registered: /api/load-site-data")
+        if status in ('completed', 'failed'):
+            response['result'] = result
+            if result and result.get('success'):
+                _remember_terrain(snapshot_id, unsaved_id)
 
-            # Add route to provide mapbox token
-            self.app.add_url_rule('/api/mapbox-token', 'mapbox_token',
-                                 self.handle_mapbox_token, methods=['GET'])
+        return jsonify(response)
 
-            app_logger.info(f"✅ Successfully registered: /api/mapbox-token")
+    def register_routes(self, app):
+        """Register routes with Flask app"""
+        self.app = app
 
+        routes = [
+            ('/terrain-viewer', 'terrain_viewer', self.handle_terrain_viewer, ['GET']),
+            # Main terrain generation API
+            ('/api/generate-terrain', 'generate_terrain', self.handle_generate_terrain, ['POST']),
+            # Terrain cache management routes
+            ('/api/terrain-cache-stats', 'terrain_cache_stats', self.handle_terrain_cache_stats, ['GET']),
+            ('/api/clear-terrain-cache', 'clear_terrain_cache', self.handle_clear_terrain_cache, ['POST']),
+            # Site data loading for terrain analysis
+            ('/api/load-site-data', 'load_site_data', self.handle_load_site_data, ['POST']),
+            # Route to provide mapbox token
+            ('/api/mapbox-token', 'mapbox_token', self.handle_mapbox_token, ['GET']),
             # Session data storage for terrain analysis
-            self.app.add_url_rule('/api/store-session-data', 'store_session_data',
-                                 self.handle_store_session_data, methods=['POST'])
+            ('/api/store-session-data', 'store_session_data', self.handle_store_session_data, ['POST']),
+            # Address-based terrain generation
+            ('/api/generate-terrain-from-address', 'generate_terrain_from_address',
+             self.handle_generate_terrain_from_address, ['POST']),
+            ('/api/generate-terrain-from-addresses', 'generate_terrain_from_addresses',
+             self.handle_generate_terrain_from_addresses, ['POST']),
+            # Background terrain job status polling
+            ('/api/terrain-job/<job_id>', 'terrain_job', self.handle_terrain_job, ['GET']),
+            # Terrain snapshot lookup by session handle
+            ('/api/terrain-snapshot/<int:snapshot_id>', 'terrain_snapshot', self.handle_terrain_snapshot, ['GET']),
+        ]
+
+        for rule, endpoint, view_func, methods in routes:
+            self.app.add_url_rule(rule, endpoint, view_func, methods=methods)
+
+        self.total_routes = len(routes)
+        app_logger.info(f"✅ Registered {self.total_routes} terrain routes: {', '.join(rule for rule, *_ in routes)}")
+
+    def handle_terrain_snapshot(self, snapshot_id: int):
+        """Return a stored terrain analysis snapshot without re-parsing it"""
+        try:
+            from database import DatabaseManager, decode_snapshot_data, SNAPSHOT_BLOB_VERSION
 
-            app_logger.info(f"✅ Successfully registered: /api/store-session-data")
+            user_id = session.get('user', {}).get('id')
+            if not user_id:
+                return jsonify({
+                    'success': False,
+                    'error': 'Authentication required'
+                }), 401
 
-            # Address-based terrain generation
-            self.app.add_url_rule('/api/generate-terrain-from-address', 'generate_terrain_from_address',
-                                 self.handle_generate_terrain_from_address, methods=['POST'])
+            db_manager = DatabaseManager()
+            with db_manager.db.get_cursor() as cursor:
+                cursor.execute("""
+                    SELECT snapshot_data
+                    FROM project_snapshots
+                    WHERE id = ? AND user_id = ? AND snapshot_type = 'terrain_analysis'
+                """, (snapshot_id, user_id))
+                row = cursor.fetchone()
+
+            if not row:
+                return jsonify({
+                    'success': False,
+                    'error': 'Terrain snapshot not found'
+                }), 404
 
-            app_logger.info(f"✅ Successfully registered: /api/generate-terrain-from-address")
+            # The stored JSON is sent as-is; compressed rows are already zlib streams, which
+            # clients accepting "deflate" can inflate themselves
+            raw = row[0]
+            if isinstance(raw, bytes) and raw[:1] == SNAPSHOT_BLOB_VERSION and 'deflate' in request.accept_encodings:
+                response = Response(raw[1:], mimetype='application/json')
+                response.headers['Content-Encoding'] = 'deflate'
+                response.vary.add('Accept-Encoding')
+                return response
 
-            self.total_routes += 1
-            app_logger.info(f"Total routes registered: {self.total_routes}")
+            return Response(decode_snapshot_data(raw), mimetype='application/json')
+
+        except Exception as e:
+            app_logger.error(f"Error loading terrain snapshot {snapshot_id}: {e}")
+            return jsonify({
+                'success': False,
+                'error': str(e)
+            }), 500
 
     def handle_mapbox_token(self):
         """API endpoint to get the mapbox token"""
@@ -809,120 +1245,114 @@ class TerrainRoutes:
 
             app_logger.info(f"Generating terrain bounds from address: {address}")
 
-            # Import geocoding service
-            try:
-                import requests
-                import time
-
-                # Use Nominatim (OpenStreetMap) for geocoding with proper headers
-                geocode_url = "https://nominatim.openstreetmap.org/search"
-                params = {
-                    'q': address,
-                    'format': 'json',
-                    'limit': 1,
-                    'bounded': 1,
-                    'countrycodes': 'nz'  # Restrict to New Zealand
-                }
-
-                # Add proper headers to avoid 403 errors
-                headers = {
-                    'User-Agent': 'EngineRoom-Terrain-Service/1.0 (engineering@engineroom.nz)',
-                    'Accept': 'application/json',
-                    'Accept-Language': 'en'
-                }
-
-                # Add a small delay to respect rate limits
-                time.sleep(1)
-
-                response = requests.get(geocode_url, params=params, headers=headers, timeout=15)
-                response.raise_for_status()
-
-                results = response.json()
-
-                if not results:
+            # Resolve from the local cache or the project's stored coordinates before calling Nominatim
+            location = _local_geocode(address, project_id, session.get('user', {}).get('id'))
+            if location:
+                app_logger.info(f"Resolved {address} locally without a geocoding request")
+            else:
+                location = _nominatim_geocode(address)
+                if not location:
                     return jsonify({
                         'success': False,
                         'error': f'Could not find location for address: {address}'
                     }), 404
+                _cache_geocode(address, *location)
 
-                result = results[0]
-                lat = float(result['lat'])
-                lng = float(result['lon'])
-
-                # Create a small boundary around the geocoded point (approximately 50m x 50m)
-                # Convert 50m to degrees (rough approximation)
-                lat_offset = 50 / 111320  # ~0.00045 degrees
-                lng_offset = 50 / (111320 * math.cos(lat * math.pi / 180))
-
-                # Create a square boundary around the point
-                coordinates = [
-                    [lng - lng_offset, lat - lat_offset],  # Southwest
-                    [lng + lng_offset, lat - lat_offset],  # Southeast  
-                    [lng + lng_offset, lat + lat_offset],  # Northeast
-                    [lng - lng_offset, lat + lat_offset],  # Northwest
-                    [lng - lng_offset, lat - lat_offset]   # Close polygon
-                ]
-
-                # Calculate terrain bounds with buffer
-                terrain_bounds = {
-                    'southwest': [lng - lng_offset * 2, lat - lat_offset * 2],
-                    'northeast': [lng + lng_offset * 2, lat + lat_offset * 2],
-                    'center': [lng, lat],
-                    'width': lng_offset * 4,
-                    'height': lat_offset * 4
-                }
+            lat, lng = location
+            app_logger.info(f"Successfully geocoded {address} to {lat}, {lng}")
 
-                # Create site data for terrain generation
-                site_data = {
-                    'coordinates': coordinates,
-                    'address': address,
-                    'center_lat': lat,
-                    'center_lng': lng,
-                    'area_m2': 2500,  # 50m x 50m
-                    'terrainBounds': terrain_bounds,
-                    'geocoded_from_address': True,
-                    'original_address': address
-                }
+            return jsonify(_address_site_data(address, lat, lng))
 
-                app_logger.info(f"Successfully geocoded {address} to {lat}, {lng}")
+        except requests.exceptions.RequestException as e:
+            app_logger.error(f"Geocoding request failed: {e}")
 
+            # Check if it's a 403/429 error (rate limited or blocked)
+            status_code = e.response.status_code if e.response is not None else None
+            if status_code in (403, 429):
                 return jsonify({
-                    'success': True,
-                    'site_data': site_data,
-                    'coordinates': coordinates,
-                    'center': [lng, lat],
-                    'terrain_bounds': terrain_bounds
-                })
+                    'success': False,
+                    'error': 'Geocoding service is temporarily unavailable due to rate limits. Please try again in a few moments.',
+                    'error_type': 'rate_limited'
+                }), 429
+            return jsonify({
+                'success': False,
+                'error': 'Geocoding service unavailable. Please check your internet connection and try again.',
+                'error_type': 'service_unavailable'
+            }), 503
 
-            except requests.exceptions.RequestException as e:
-                app_logger.error(f"Geocoding request failed: {e}")
+        except Exception as e:
+            app_logger.error(f"Error generating terrain from address: {e}")
+            return jsonify({
+                'success': False,
+                'error': f'Geocoding failed: {str(e)}'
+            }), 500
 
-                # Check if it's a 403 error (rate limited or blocked)
-                if hasattr(e, 'response') and e.response and e.response.status_code == 403:
-                    return jsonify({
-                        'success': False,
-                        'error': 'Geocoding service is temporarily unavailable due to rate limits. Please try again in a few moments.',
-                        'error_type': 'rate_limited'
-                    }), 429
-                else:
-                    return jsonify({
-                        'success': False,
-                        'error': 'Geocoding service unavailable. Please check your internet connection and try again.',
-                        'error_type': 'service_unavailable'
-                    }), 503
+    def handle_generate_terrain_from_addresses(self):
+        """Generate terrain bounds for several addresses, geocoding misses concurrently"""
+        try:
+            data = request.get_json()
+            addresses = data.get('addresses') if data else None
+            if not addresses or not isinstance(addresses, list):
+                return jsonify({
+                    'success': False,
+                    'error': 'A list of addresses is required'
+                }), 400
 
-            except Exception as e:
-                app_logger.error(f"Geocoding error: {e}")
+            if len(addresses) > MAX_BATCH_ADDRESSES:
                 return jsonify({
                     'success': False,
-                    'error': f'Geocoding failed: {str(e)}'
-                }), 500
+                    'error': f'At most {MAX_BATCH_ADDRESSES} addresses can be geocoded per request'
+                }), 400
+
+            project_id = data.get('project_id')
+            user_id = session.get('user', {}).get('id')
+            unique_addresses = list(dict.fromkeys(a for a in addresses if isinstance(a, str) and a.strip()))
+            app_logger.info(f"Generating terrain bounds for {len(unique_addresses)} addresses")
+
+            locations = {}
+            misses = []
+            for address in unique_addresses:
+                location = _local_geocode(address, project_id, user_id)
+                if location:
+                    locations[address] = location
+                else:
+                    misses.append(address)
+
+            def geocode(address):
+                try:
+                    return address, _nominatim_geocode(address), None
+                except requests.exceptions.RequestException as e:
+                    app_logger.error(f"Geocoding request failed for {address}: {e}")
+                    return address, None, 'Geocoding service unavailable'
+
+            # Requests still start one per rate-limit interval, but their round trips overlap
+            errors = {}
+            if misses:
+                with ThreadPoolExecutor(max_workers=min(GEOCODE_WORKERS, len(misses))) as executor:
+                    for address, location, error in executor.map(geocode, misses):
+                        if location:
+                            _cache_geocode(address, *location)
+                            locations[address] = location
+                        else:
+                            errors[address] = error or f'Could not find location for address: {address}'
+
+            results = []
+            for address in unique_addresses:
+                if address in locations:
+                    results.append({'address': address, **_address_site_data(address, *locations[address])})
+                else:
+                    results.append({'address': address, 'success': False, 'error': errors[address]})
+
+            return jsonify({
+                'success': any(result['success'] for result in results),
+                'results': results
+            })
 
         except Exception as e:
-            app_logger.error(f"Error generating terrain from address: {e}")
+            app_logger.error(f"Error generating terrain from addresses: {e}")
             return jsonify({
                 'success': False,
-                'error': str(e)
+                'error': f'Geocoding failed: {str(e)}'
             }), 500
 
     def handle_store_session_data(self):
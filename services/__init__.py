@@ -1,23 +1,69 @@
 """
 Services Package
 Centralized business logic services for EngineRoom
+
+Services are imported lazily on first attribute access (PEP 562), so importing
+one service - or just the package - doesn't pay for importing all of them.
 """
-from .council_service import CouncilService, council_service
-from .gradient_service import GradientService, gradient_service
-from .chat_service import ChatService
-from .response_service import ResponseService, response_service
-from .api_calculation_service import ApiCalculationService, api_calculation_service
-from .floorplan_service import floorplan_service
-from .building_service import building_service
-from .property_service import property_service
+import importlib
+import sys
+import types
+
+# Exported name -> submodule that defines it
+_LAZY_IMPORTS = {
+    'CouncilService': '.council_service',
+    'council_service': '.council_service',
+    'GradientService': '.gradient_service',
+    'gradient_service': '.gradient_service',
+    'ChatService': '.chat_service',
+    'ResponseService': '.response_service',
+    'response_service': '.response_service',
+    'ApiCalculationService': '.api_calculation_service',
+    'api_calculation_service': '.api_calculation_service',
+    'floorplan_service': '.floorplan_service',
+    'building_service': '.building_service',
+    'property_service': '.property_service',
+
+    'terrain_service': '.terrain_service',
+    'earthworks_service': '.earthworks_service',
+
+    # Default beam specifications are seeded on first use inside BeamService
+    'beam_service': '.beam_service',
+    'BeamService': '.beam_service',
+}
+
+
+def __getattr__(name):
+    module_name = _LAZY_IMPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    module = importlib.import_module(module_name, __name__)
+    # Cache every name the submodule provides so later lookups bypass __getattr__
+    for exported, source in _LAZY_IMPORTS.items():
+        if source == module_name:
+            globals()[exported] = getattr(module, exported)
+    return globals()[name]
+
+
+class _LazyServicesModule(types.ModuleType):
+    """Package module that keeps exported services bound over same-named submodules"""
+
+    def __setattr__(self, name, value):
+        # The import system binds each loaded submodule onto the package. Where the
+        # package exports an object of the same name (the council_service instance
+        # vs the council_service module) keep the object, as `from .x import x` did
+        if (isinstance(value, types.ModuleType) and _LAZY_IMPORTS.get(name) == f'.{name}'
+                and hasattr(value, name)):
+            value = getattr(value, name)
+        super().__setattr__(name, value)
+
 
-from .terrain_service import terrain_service
-from .earthworks_service import earthworks_service
+sys.modules[__name__].__class__ = _LazyServicesModule
 
-from .beam_service import beam_service, BeamService
 
-# Initialize default beam specifications
-BeamService.initialize_default_beam_specifications()
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_IMPORTS))
 
 
 __all__ = [
@@ -34,4 +80,4 @@ __all__ = [
     'earthworks_service',
     'beam_service', 'BeamService'
 
-]
\ No newline at end of file
+]
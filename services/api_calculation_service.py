@@ -3,11 +3,15 @@
 API Calculation Service
 Handles complex calculations extracted from routes
 """
+from collections import Counter
 from typing import Dict, Any, List, Optional
 from .base_service import BaseService
 from . import council_service
 import time
 
+COUNCIL_REQUIREMENTS_CACHE_SIZE = 1024
+VALID_EDGE_TYPES = ('street_frontage', 'side', 'rear')
+
 
 class ApiCalculationService(BaseService):
     """Service for API calculation operations"""
@@ -15,6 +19,22 @@ class ApiCalculationService(BaseService):
     def __init__(self):
         super().__init__("ApiCalculationService")
     
+    def _get_council_requirements(self, council_name: str, zoning: str) -> Optional[Dict[str, Any]]:
+        """Council requirements memoized per (council, zoning), case-insensitively, with LRU eviction"""
+        key = ('council_requirements', council_name.strip().lower(), zoning.strip().lower())
+        cached = self._cache.pop(key, None)
+        if cached is not None:
+            # Re-insert so dict order tracks recency
+            self._cache[key] = cached
+            return cached
+        
+        requirements = council_service.get_council_requirements(council_name, zoning)
+        if requirements is not None:
+            self._cache[key] = requirements
+            if len(self._cache) > COUNCIL_REQUIREMENTS_CACHE_SIZE:
+                self._cache.pop(next(iter(self._cache)))
+        return requirements
+    
     def calculate_buildable_area(self, site_coords: List[Dict], requirements: Dict, 
                                frontage: Optional[str] = None, 
                                edge_classifications: Optional[List[Dict]] = None) -> Dict[str, Any]:
@@ -71,7 +91,7 @@ class ApiCalculationService(BaseService):
             
             if council_name:
                 self._log_operation("Council requirements lookup", f"{council_name}, zoning: {zoning}")
-                council_requirements = council_service.get_council_requirements(council_name, zoning)
+                council_requirements = self._get_council_requirements(council_name, zoning)
                 enhanced_data['council_requirements'] = council_requirements
                 
                 # Calculate buildable area if coordinates available
@@ -119,18 +139,17 @@ class ApiCalculationService(BaseService):
                 raise ValueError("Edge classifications are required")
             
             total_edges = len(edge_classifications)
-            classified_edges = [edge for edge in edge_classifications 
-                              if edge.get('type') in ['street_frontage', 'side', 'rear']]
+            edge_types = [edge.get('type') for edge in edge_classifications]
+            type_counts = Counter(edge_types)
             
-            if len(classified_edges) != total_edges:
+            if sum(type_counts[edge_type] for edge_type in VALID_EDGE_TYPES) != total_edges:
                 raise ValueError("All edges must be classified as street frontage, side, or rear")
             
-            frontage_edges = [edge for edge in edge_classifications 
-                            if edge.get('type') == 'street_frontage']
+            frontage_edges = type_counts['street_frontage']
             if not frontage_edges:
                 raise ValueError("At least one edge must be classified as street frontage")
             
-            classifications_summary = [(i, edge.get('type')) for i, edge in enumerate(edge_classifications)]
+            classifications_summary = list(enumerate(edge_types))
             self._log_operation("Edge classifications validated", f"Classifications: {classifications_summary}")
             
             return {
@@ -139,7 +158,7 @@ class ApiCalculationService(BaseService):
                 'confirmed': True,
                 'timestamp': time.time(),
                 'total_edges': total_edges,
-                'frontage_edges': len(frontage_edges)
+                'frontage_edges': frontage_edges
             }
             
         except Exception as e:
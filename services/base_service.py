@@ -3,14 +3,23 @@ Base Service Class
 Provides common functionality for all services
 """
 import logging
+from time import monotonic
 from abc import ABC, abstractmethod
-from typing import Any, Dict, Optional, Tuple
+from typing import Any, Dict, Optional
 from utils.logger import app_logger
 
+# Flask is optional for services; (has_app_context, current_app) once imported,
+# None when Flask is unavailable
+_UNRESOLVED = object()
+_flask_context = _UNRESOLVED
+
 
 class BaseService(ABC):
     """Base class for all services with common functionality"""
 
+    # Subclasses that declare their own __slots__ get no per-instance __dict__
+    __slots__ = ('service_name', 'logger', '_cache')
+
     def __init__(self, service_name: str):
         self.service_name = service_name
         self.logger = app_logger
@@ -28,8 +37,8 @@ class BaseService(ABC):
             message += f": {details}"
         self.logger.info(message)
 
-    def _handle_error(self, operation: str, error: Exception) -> Tuple[str, str]:
-        """Handle service errors with proper logging"""
+    def _handle_error(self, operation: str, error: Exception, fallback: Any = None) -> Any:
+        """Handle service errors with proper logging, returning the caller's fallback result"""
         error_message = f"Error in {operation}: {str(error)}"
 
         # Log the error with context
@@ -38,41 +47,74 @@ class BaseService(ABC):
             'service': self.__class__.__name__
         })
 
-        # Also log to Flask app logger if available
-        try:
-            from flask import current_app
-            if current_app:
-                current_app.logger.error(f"[{self.__class__.__name__}] {error_message}")
-        except (ImportError, RuntimeError):
-            # Flask context not available, skip additional logging
-            pass
+        # Also log to Flask app logger when running inside an app context
+        app = self._flask_app()
+        if app is not None:
+            app.logger.error(f"[{self.__class__.__name__}] {error_message}")
+
+        return fallback
+
+    @staticmethod
+    def _flask_app() -> Optional[Any]:
+        """Current Flask app, or None outside an app context; the import is resolved once"""
+        global _flask_context
+        if _flask_context is _UNRESOLVED:
+            try:
+                from flask import current_app, has_app_context
+                _flask_context = (has_app_context, current_app)
+            except ImportError:
+                _flask_context = None
 
-        return error_message, ""
+        if _flask_context is None:
+            return None
+        has_app_context, current_app = _flask_context
+        return current_app if has_app_context() else None
 
 
 class CacheableService(BaseService):
     """Service with enhanced caching capabilities"""
 
-    def __init__(self, service_name: str, cache_ttl: int = 3600):
+    __slots__ = ('cache_ttl', 'cache_max_size', '_cache_timestamps')
+
+    def __init__(self, service_name: str, cache_ttl: int = 3600, cache_max_size: Optional[int] = None):
         super().__init__(service_name)
         self.cache_ttl = cache_ttl
+        # None leaves the cache unbounded; otherwise least recently used entries are evicted
+        self.cache_max_size = cache_max_size
         self._cache_timestamps = {}
 
+    def clear_cache(self) -> None:
+        """Clear service cache along with its timestamps"""
+        self._cache_timestamps.clear()
+        super().clear_cache()
+
     def _is_cache_valid(self, key: str) -> bool:
         """Check if cached data is still valid"""
-        import time
-        if key not in self._cache_timestamps:
+        timestamp = self._cache_timestamps.get(key)
+        if timestamp is None:
             return False
-        return (time.time() - self._cache_timestamps[key]) < self.cache_ttl
+        # Monotonic clock: TTLs are unaffected by wall-clock adjustments
+        return (monotonic() - timestamp) < self.cache_ttl
 
     def _set_cache(self, key: str, value: Any) -> None:
-        """Set cache with timestamp"""
-        import time
+        """Set cache with timestamp, evicting the least recently used entry when full"""
+        self._cache.pop(key, None)
         self._cache[key] = value
-        self._cache_timestamps[key] = time.time()
+        self._cache_timestamps[key] = monotonic()
+        if self.cache_max_size is not None:
+            while len(self._cache) > self.cache_max_size:
+                # Tolerate a concurrent request having evicted the same entry
+                oldest = next(iter(self._cache))
+                self._cache.pop(oldest, None)
+                self._cache_timestamps.pop(oldest, None)
 
     def _get_cache(self, key: str) -> Optional[Any]:
-        """Get cached value if valid"""
-        if self._is_cache_valid(key):
-            return self._cache.get(key)
-        return None
\ No newline at end of file
+        """Get cached value if valid, dropping it once expired"""
+        value = self._cache.pop(key, None) if self._is_cache_valid(key) else None
+        if value is None:
+            self._cache.pop(key, None)
+            self._cache_timestamps.pop(key, None)
+            return None
+        # Re-insert so dict order tracks recency
+        self._cache[key] = value
+        return value
@@ -5,17 +5,141 @@ The code has been updated with a method to get the beam designation by element t
 Beam Service - Manages I-beam specifications and selections
 """
 import sqlite3
+import threading
 from typing import List, Dict, Any, Optional
+import numpy as np
 from database import db_manager
 from utils.logger import app_logger
+from .base_service import CacheableService
+
+# Query text lives at module scope so every call submits the identical string
+# and hits sqlite3's per-connection prepared-statement cache
+SPEC_COLUMNS = '''
+    id, material, designation, section_depth_mm, grade_mpa,
+    density_kg_m, width_mm, flange_thickness_mm, web_thickness_mm,
+    section_area_mm2, moment_inertia_x_mm4, section_modulus_x_mm3,
+    moment_inertia_y_mm4, section_modulus_y_mm3
+'''
+
+ALL_SPECS_SQL = f'''
+    SELECT {SPEC_COLUMNS}, created_at
+    FROM beam_specifications
+    ORDER BY material, designation, grade_mpa
+'''
+
+SPECS_EXIST_SQL = 'SELECT EXISTS(SELECT 1 FROM beam_specifications)'
+
+SPEC_BY_ID_SQL = f'''
+    SELECT {SPEC_COLUMNS}
+    FROM beam_specifications
+    WHERE id = ?
+'''
+
+SPEC_BY_DESIGNATION_SQL = f'''
+    SELECT {SPEC_COLUMNS}
+    FROM beam_specifications
+    WHERE designation = ?
+    ORDER BY grade_mpa DESC
+    LIMIT 1
+'''
+
+# Insert order for INSERT_SPEC_SQL parameters
+SPEC_INSERT_FIELDS = (
+    'material', 'designation', 'section_depth_mm', 'grade_mpa',
+    'density_kg_m', 'width_mm', 'flange_thickness_mm', 'web_thickness_mm',
+    'section_area_mm2', 'moment_inertia_x_mm4', 'section_modulus_x_mm3',
+    'moment_inertia_y_mm4', 'section_modulus_y_mm3'
+)
+
+INSERT_SPEC_SQL = '''
+    INSERT INTO beam_specifications (
+        material, designation, section_depth_mm, grade_mpa,
+        density_kg_m, width_mm, flange_thickness_mm, web_thickness_mm,
+        section_area_mm2, moment_inertia_x_mm4, section_modulus_x_mm3,
+        moment_inertia_y_mm4, section_modulus_y_mm3
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+UPSERT_SELECTION_SQL = '''
+    INSERT INTO user_beam_selections (session_id, element_type, beam_specification_id)
+    VALUES (?, ?, ?)
+    ON CONFLICT(session_id, element_type) DO UPDATE SET
+        beam_specification_id = excluded.beam_specification_id,
+        created_at = CURRENT_TIMESTAMP
+'''
+
+USER_SELECTIONS_SQL = '''
+    SELECT ubs.element_type, bs.*
+    FROM user_beam_selections ubs
+    JOIN beam_specifications bs ON ubs.beam_specification_id = bs.id
+    WHERE ubs.session_id = ?
+'''
+
+# digest_agg is registered on every connection by the database layer; the
+# designations are hashed in SQLite rather than concatenated and shipped over
+SPECS_METADATA_SQL = '''
+    SELECT COUNT(*) as count,
+           MAX(created_at) as last_modified,
+           digest_agg(designation) as designations_hash
+    FROM (SELECT designation, created_at FROM beam_specifications ORDER BY designation)
+'''
+
+DESIGNATION_BY_TYPE_SQL = '''
+    SELECT bs.designation
+    FROM user_beam_selections ubs
+    JOIN beam_specifications bs ON ubs.beam_specification_id = bs.id
+    WHERE ubs.session_id = ? AND ubs.element_type = ?
+'''
+
+# Unit conversions to SI, applied as multiplications
+MM_TO_M = 1e-3
+MM2_TO_M2 = 1e-6
+MM3_TO_M3 = 1e-9
+MM4_TO_M4 = 1e-12
+
+# (frame parameter, spec column, scale) in the column order of the bulk array
+FRAME_PARAM_CONVERSIONS = (
+    ('depth', 'section_depth_mm', MM_TO_M),
+    ('width', 'width_mm', MM_TO_M),
+    ('flange_thickness', 'flange_thickness_mm', MM_TO_M),
+    ('web_thickness', 'web_thickness_mm', MM_TO_M),
+    ('density', 'density_kg_m', 1.0),
+    ('section_area', 'section_area_mm2', MM2_TO_M2),
+    ('moment_inertia_x', 'moment_inertia_x_mm4', MM4_TO_M4),
+    ('section_modulus_x', 'section_modulus_x_mm3', MM3_TO_M3),
+    ('moment_inertia_y', 'moment_inertia_y_mm4', MM4_TO_M4),
+    ('section_modulus_y', 'section_modulus_y_mm3', MM3_TO_M3),
+)
+FRAME_PARAM_SCALES = np.array([scale for _, _, scale in FRAME_PARAM_CONVERSIONS])
+
+
+class BeamService(CacheableService):
+    """Service for managing I-beam specifications and selections"""
 
+    # Schema DDL and default seeding run once per process, on first use
+    # rather than at package import; afterwards the check is a flag read
+    _tables_ready = False
+    _tables_lock = threading.RLock()
 
-class BeamService:
-    """Service for managing I-beam specifications and selections"""
+    def __init__(self):
+        super().__init__("BeamService")
 
-    @staticmethod
-    def _ensure_beam_tables_exist():
+    @classmethod
+    def _ensure_beam_tables_exist(cls):
         """Ensure beam specification tables exist"""
+        if cls._tables_ready:
+            return
+
+        with cls._tables_lock:
+            if cls._tables_ready:
+                return
+            cls._create_beam_tables()
+            cls._seed_default_beam_specifications()
+            cls._tables_ready = True
+
+    @staticmethod
+    def _create_beam_tables():
+        """Create beam specification tables and indexes"""
         try:
             with db_manager.db.get_cursor() as cursor:
                 # I-beam specifications table
@@ -54,9 +178,28 @@ class BeamService:
 
                 # Create indexes
                 cursor.execute('CREATE INDEX IF NOT EXISTS idx_beam_specs_material ON beam_specifications(material)')
-                cursor.execute('CREATE INDEX IF NOT EXISTS idx_beam_specs_designation ON beam_specifications(designation)')
-                cursor.execute('CREATE INDEX IF NOT EXISTS idx_user_selections_session ON user_beam_selections(session_id)')
-                cursor.execute('CREATE INDEX IF NOT EXISTS idx_user_selections_element ON user_beam_selections(element_type)')
+                # Serves designation lookups and their ORDER BY grade_mpa DESC LIMIT 1 without a sort
+                cursor.execute('CREATE INDEX IF NOT EXISTS idx_beam_specs_designation_grade ON beam_specifications(designation, grade_mpa DESC)')
+                cursor.execute('DROP INDEX IF EXISTS idx_beam_specs_designation')
+                cursor.execute('CREATE INDEX IF NOT EXISTS idx_user_selections_spec ON user_beam_selections(beam_specification_id)')
+
+                # One selection per (session, element type); keep the newest row from
+                # databases created before the constraint so the unique index can build
+                cursor.execute('''
+                    DELETE FROM user_beam_selections
+                    WHERE id NOT IN (
+                        SELECT MAX(id) FROM user_beam_selections
+                        GROUP BY session_id, element_type
+                    )
+                ''')
+                cursor.execute('''
+                    CREATE UNIQUE INDEX IF NOT EXISTS idx_user_selections_session_element
+                    ON user_beam_selections(session_id, element_type)
+                ''')
+
+                # The composite index serves session-only lookups as a prefix
+                cursor.execute('DROP INDEX IF EXISTS idx_user_selections_session')
+                cursor.execute('DROP INDEX IF EXISTS idx_user_selections_element')
 
             app_logger.info("Beam specification tables initialized successfully")
         except Exception as e:
@@ -68,20 +211,18 @@ class BeamService:
         """Get all beam specifications with complete metadata"""
         BeamService._ensure_beam_tables_exist()
 
+        cached_specs = beam_service._get_cache('all_specs')
+        if cached_specs is not None:
+            return cached_specs
+
         try:
-            with db_manager.db.get_cursor() as cursor:
-                cursor.execute('''
-                    SELECT id, material, designation, section_depth_mm, grade_mpa,
-                           density_kg_m, width_mm, flange_thickness_mm, web_thickness_mm,
-                           section_area_mm2, moment_inertia_x_mm4, section_modulus_x_mm3,
-                           moment_inertia_y_mm4, section_modulus_y_mm3, created_at
-                    FROM beam_specifications
-                    ORDER BY material, designation, grade_mpa
-                ''')
+            with db_manager.db.get_read_cursor() as cursor:
+                cursor.execute(ALL_SPECS_SQL)
 
                 specifications = [dict(row) for row in cursor.fetchall()]
                 app_logger.info(f"Retrieved {len(specifications)} beam specifications with complete metadata")
-                return specifications
+            beam_service._set_cache('all_specs', specifications)
+            return specifications
         except Exception as e:
             app_logger.error(f"Failed to get beam specifications: {e}")
             return []
@@ -92,15 +233,8 @@ class BeamService:
         BeamService._ensure_beam_tables_exist()
 
         try:
-            with db_manager.db.get_cursor() as cursor:
-                cursor.execute('''
-                    SELECT id, material, designation, section_depth_mm, grade_mpa,
-                           density_kg_m, width_mm, flange_thickness_mm, web_thickness_mm,
-                           section_area_mm2, moment_inertia_x_mm4, section_modulus_x_mm3,
-                           moment_inertia_y_mm4, section_modulus_y_mm3
-                    FROM beam_specifications
-                    WHERE id = ?
-                ''', (spec_id,))
+            with db_manager.db.get_read_cursor() as cursor:
+                cursor.execute(SPEC_BY_ID_SQL, (spec_id,))
 
                 row = cursor.fetchone()
                 return dict(row) if row else None
@@ -114,17 +248,8 @@ class BeamService:
         BeamService._ensure_beam_tables_exist()
 
         try:
-            with db_manager.db.get_cursor() as cursor:
-                cursor.execute('''
-                    SELECT id, material, designation, section_depth_mm, grade_mpa,
-                           density_kg_m, width_mm, flange_thickness_mm, web_thickness_mm,
-                           section_area_mm2, moment_inertia_x_mm4, section_modulus_x_mm3,
-                           moment_inertia_y_mm4, section_modulus_y_mm3
-                    FROM beam_specifications
-                    WHERE designation = ?
-                    ORDER BY grade_mpa DESC
-                    LIMIT 1
-                ''', (designation,))
+            with db_manager.db.get_read_cursor() as cursor:
+                cursor.execute(SPEC_BY_DESIGNATION_SQL, (designation,))
 
                 row = cursor.fetchone()
                 return dict(row) if row else None
@@ -139,32 +264,12 @@ class BeamService:
 
         try:
             with db_manager.db.get_cursor() as cursor:
-                cursor.execute('''
-                    INSERT INTO beam_specifications (
-                        material, designation, section_depth_mm, grade_mpa,
-                        density_kg_m, width_mm, flange_thickness_mm, web_thickness_mm,
-                        section_area_mm2, moment_inertia_x_mm4, section_modulus_x_mm3,
-                        moment_inertia_y_mm4, section_modulus_y_mm3
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    spec_data['material'],
-                    spec_data['designation'],
-                    spec_data['section_depth_mm'],
-                    spec_data['grade_mpa'],
-                    spec_data['density_kg_m'],
-                    spec_data['width_mm'],
-                    spec_data['flange_thickness_mm'],
-                    spec_data['web_thickness_mm'],
-                    spec_data['section_area_mm2'],
-                    spec_data['moment_inertia_x_mm4'],
-                    spec_data['section_modulus_x_mm3'],
-                    spec_data['moment_inertia_y_mm4'],
-                    spec_data['section_modulus_y_mm3']
-                ))
+                cursor.execute(INSERT_SPEC_SQL, tuple(spec_data[field] for field in SPEC_INSERT_FIELDS))
 
                 spec_id = cursor.lastrowid
                 app_logger.info(f"Added beam specification: {spec_data['designation']} ({spec_id})")
-                return spec_id
+            beam_service.clear_cache()
+            return spec_id
         except Exception as e:
             app_logger.error(f"Failed to add beam specification: {e}")
             raise
@@ -176,17 +281,8 @@ class BeamService:
 
         try:
             with db_manager.db.get_cursor() as cursor:
-                # Remove existing selection for this element type
-                cursor.execute('''
-                    DELETE FROM user_beam_selections 
-                    WHERE session_id = ? AND element_type = ?
-                ''', (session_id, element_type))
-
-                # Add new selection
-                cursor.execute('''
-                    INSERT INTO user_beam_selections (session_id, element_type, beam_specification_id)
-                    VALUES (?, ?, ?)
-                ''', (session_id, element_type, beam_spec_id))
+                # Replace any existing selection for this element type in one statement
+                cursor.execute(UPSERT_SELECTION_SQL, (session_id, element_type, beam_spec_id))
 
                 app_logger.info(f"Saved beam selection for {element_type}: {beam_spec_id}")
                 return True
@@ -200,18 +296,17 @@ class BeamService:
         BeamService._ensure_beam_tables_exist()
 
         try:
-            with db_manager.db.get_cursor() as cursor:
-                cursor.execute('''
-                    SELECT ubs.element_type, bs.*
-                    FROM user_beam_selections ubs
-                    JOIN beam_specifications bs ON ubs.beam_specification_id = bs.id
-                    WHERE ubs.session_id = ?
-                ''', (session_id,))
+            with db_manager.db.get_read_cursor() as cursor:
+                # Plain tuples zipped with the column names once, instead of
+                # sqlite3.Row objects converted and keyed row by row
+                cursor.row_factory = None
+                cursor.execute(USER_SELECTIONS_SQL, (session_id,))
+                columns = [description[0] for description in cursor.description]
 
                 selections = {}
                 for row in cursor.fetchall():
-                    element_type = row['element_type']
-                    selections[element_type] = dict(row)
+                    selection = dict(zip(columns, row))
+                    selections[selection['element_type']] = selection
 
                 return selections
         except Exception as e:
@@ -223,24 +318,25 @@ class BeamService:
         """Get metadata about beam specifications for change detection"""
         BeamService._ensure_beam_tables_exist()
 
+        cached_metadata = beam_service._get_cache('specs_metadata')
+        if cached_metadata is not None:
+            return cached_metadata
+
         try:
-            with db_manager.db.get_cursor() as cursor:
-                cursor.execute('''
-                    SELECT COUNT(*) as count, 
-                           MAX(created_at) as last_modified,
-                           GROUP_CONCAT(designation ORDER BY designation) as designations
-                    FROM beam_specifications
-                ''')
+            with db_manager.db.get_read_cursor() as cursor:
+                cursor.execute(SPECS_METADATA_SQL)
 
                 row = cursor.fetchone()
                 if row:
-                    return {
+                    metadata = {
                         'count': row['count'],
                         'last_modified': row['last_modified'],
-                        'designations_hash': hash(row['designations']) if row['designations'] else 0
+                        'designations_hash': row['designations_hash'] if row['count'] else 0
                     }
                 else:
-                    return {'count': 0, 'last_modified': None, 'designations_hash': 0}
+                    metadata = {'count': 0, 'last_modified': None, 'designations_hash': 0}
+            beam_service._set_cache('specs_metadata', metadata)
+            return metadata
         except Exception as e:
             app_logger.error(f"Failed to get beam specifications metadata: {e}")
             return {'count': 0, 'last_modified': None, 'designations_hash': 0}
@@ -249,23 +345,38 @@ class BeamService:
     def convert_beam_spec_to_frame_params(beam_spec: Dict[str, Any]) -> Dict[str, float]:
         """Convert beam specification to rigid frame parameters (mm to m)"""
         return {
-            'depth': beam_spec['section_depth_mm'] / 1000.0,  # mm to m
-            'width': beam_spec['width_mm'] / 1000.0,  # mm to m
-            'flange_thickness': beam_spec['flange_thickness_mm'] / 1000.0,  # mm to m
-            'web_thickness': beam_spec['web_thickness_mm'] / 1000.0,  # mm to m
+            'depth': beam_spec['section_depth_mm'] * MM_TO_M,
+            'width': beam_spec['width_mm'] * MM_TO_M,
+            'flange_thickness': beam_spec['flange_thickness_mm'] * MM_TO_M,
+            'web_thickness': beam_spec['web_thickness_mm'] * MM_TO_M,
             'density': beam_spec['density_kg_m'],  # Already in kg/m
-            'section_area': beam_spec['section_area_mm2'] / 1000000.0,  # mm² to m²
-            'moment_inertia_x': beam_spec['moment_inertia_x_mm4'] / 1000000000000.0,  # mm⁴ to m⁴
-            'section_modulus_x': beam_spec['section_modulus_x_mm3'] / 1000000000.0,  # mm³ to m³
-            'moment_inertia_y': beam_spec['moment_inertia_y_mm4'] / 1000000000000.0,  # mm⁴ to m⁴
-            'section_modulus_y': beam_spec['section_modulus_y_mm3'] / 1000000000.0,  # mm³ to m³
+            'section_area': beam_spec['section_area_mm2'] * MM2_TO_M2,
+            'moment_inertia_x': beam_spec['moment_inertia_x_mm4'] * MM4_TO_M4,
+            'section_modulus_x': beam_spec['section_modulus_x_mm3'] * MM3_TO_M3,
+            'moment_inertia_y': beam_spec['moment_inertia_y_mm4'] * MM4_TO_M4,
+            'section_modulus_y': beam_spec['section_modulus_y_mm3'] * MM3_TO_M3,
         }
 
+    @staticmethod
+    def convert_beam_specs_bulk(beam_specs: List[Dict[str, Any]]) -> np.ndarray:
+        """Convert many beam specifications at once; rows follow FRAME_PARAM_CONVERSIONS order"""
+        columns = [column for _, column, _ in FRAME_PARAM_CONVERSIONS]
+        values = np.fromiter(
+            (spec[column] for spec in beam_specs for column in columns),
+            dtype=np.float64,
+            count=len(beam_specs) * len(columns)
+        ).reshape(len(beam_specs), len(columns))
+        return values * FRAME_PARAM_SCALES
+
     @staticmethod
     def initialize_default_beam_specifications():
         """Initialize database with common Australian/NZ steel beam specifications"""
         BeamService._ensure_beam_tables_exist()
+        BeamService._seed_default_beam_specifications()
 
+    @staticmethod
+    def _seed_default_beam_specifications():
+        """Insert the default specifications when the table is empty; tables must exist"""
         # Common steel beam specifications
         default_specs = [
             {
@@ -331,13 +442,21 @@ class BeamService:
         ]
 
         try:
-            existing_specs = BeamService.get_all_beam_specifications()
-            if not existing_specs:
-                for spec in default_specs:
-                    BeamService.add_beam_specification(spec)
-                app_logger.info(f"Initialized {len(default_specs)} default beam specifications")
+            with db_manager.db.get_cursor() as cursor:
+                cursor.execute(SPECS_EXIST_SQL)
+                specs_exist = cursor.fetchone()[0]
+
+                if not specs_exist:
+                    # Seed every row in one transaction instead of one commit per spec
+                    cursor.executemany(INSERT_SPEC_SQL, [
+                        tuple(spec[field] for field in SPEC_INSERT_FIELDS) for spec in default_specs
+                    ])
+
+            if specs_exist:
+                app_logger.info("Beam specifications already exist")
             else:
-                app_logger.info(f"Beam specifications already exist ({len(existing_specs)} found)")
+                beam_service.clear_cache()
+                app_logger.info(f"Initialized {len(default_specs)} default beam specifications")
         except Exception as e:
             app_logger.error(f"Failed to initialize default beam specifications: {e}")
 
@@ -347,13 +466,8 @@ class BeamService:
         BeamService._ensure_beam_tables_exist()
 
         try:
-            with db_manager.db.get_cursor() as cursor:
-                cursor.execute('''
-                    SELECT bs.designation
-                    FROM user_beam_selections ubs
-                    JOIN beam_specifications bs ON ubs.beam_specification_id = bs.id
-                    WHERE ubs.session_id = ? AND ubs.element_type = ?
-                ''', (session_id, element_type))
+            with db_manager.db.get_read_cursor() as cursor:
+                cursor.execute(DESIGNATION_BY_TYPE_SQL, (session_id, element_type))
 
                 result = cursor.fetchone()
                 return result[0] if result else None
@@ -3,17 +3,33 @@
 Building Service
 Handles 3D building model generation and calculations
 """
+import copy
+import hashlib
+import json
 from typing import Dict, Any, List
-from .base_service import BaseService
+import numpy as np
+from .base_service import CacheableService
 from .geometry_calculator import GeometryCalculator
 from utils.logger import app_logger
 
+# Square metres per square degree near the equator, and the share of a site
+# assumed buildable when no buildable area was supplied
+DEG2_TO_M2 = 111320.0 ** 2
+USABLE_FRACTION = 0.7
+FALLBACK_BUILDABLE_AREA_M2 = 200.0
 
-class BuildingService(BaseService):
+# Generated models kept for repeat requests; keys come from user input, so the cache is bounded
+BUILDING_CACHE_SIZE = 256
+
+# Unit-square corners (lat, lng) of the rectangular fallback footprint
+FALLBACK_FOOTPRINT_CORNERS = np.array([[-1, -1], [-1, 1], [1, 1], [1, -1]], dtype=np.float64)
+
+
+class BuildingService(CacheableService):
     """Service for building model generation and calculations"""
     
     def __init__(self):
-        super().__init__("BuildingService")
+        super().__init__("BuildingService", cache_max_size=BUILDING_CACHE_SIZE)
         self.geometry_calc = GeometryCalculator()
     
     def generate_3d_building(self, site_coords: List[Dict], buildable_area: Dict[str, Any], 
@@ -29,6 +45,13 @@ class BuildingService(BaseService):
             if not building_params:
                 raise ValueError('Building parameters required')
             
+            # Generation is deterministic in its inputs; serve repeats from cache
+            cache_key = self._generate_cache_key(site_coords, buildable_area, building_params)
+            cached_result = self._get_cache(cache_key)
+            if cached_result:
+                self._log_operation("Cache hit", "Returning cached 3D building")
+                return copy.deepcopy(cached_result)
+            
             # Extract building parameters
             storeys = building_params.get('storeys', 2)
             storey_height = building_params.get('storey_height', 3.0)
@@ -71,10 +94,12 @@ class BuildingService(BaseService):
             self._log_operation("3D building generated", 
                               f"{total_height}m high, {storeys} storeys, {footprint_area:.1f}m² footprint")
             
-            return {
+            result = {
                 'success': True,
                 'building_data': building_data
             }
+            self._set_cache(cache_key, copy.deepcopy(result))
+            return result
             
         except Exception as e:
             return self._handle_error("3D building generation", e, {
@@ -85,44 +110,56 @@ class BuildingService(BaseService):
     def create_building_footprint(self, coords: List, coverage_percent: float) -> List[List[float]]:
         """Create a building footprint within the given coordinates"""
         try:
-            from shapely.geometry import Polygon
-            import numpy as np
-            
-            # Convert to shapely polygon
+            # Vertices as an (N, 2) array of (lng, lat)
             if isinstance(coords[0], dict):
                 poly_coords = [(coord['lng'], coord['lat']) for coord in coords]
             else:
                 poly_coords = [(coord[1], coord[0]) for coord in coords]
             
-            polygon = Polygon(poly_coords)
-            centroid = polygon.centroid
+            if len(poly_coords) < 3:
+                return self._create_fallback_footprint(coords)
+            
+            pts = np.asarray(poly_coords, dtype=np.float64)
+            center = self._polygon_centroid(pts)
             
             # Create a scaled-down version of the polygon for the building footprint
             scale_factor = np.sqrt(coverage_percent / 100.0) * 0.8
             
-            # Scale the polygon around its centroid
-            building_coords = []
-            for lng, lat in poly_coords:
-                # Translate to origin
-                lng_translated = lng - centroid.x
-                lat_translated = lat - centroid.y
-                
-                # Scale
-                lng_scaled = lng_translated * scale_factor
-                lat_scaled = lat_translated * scale_factor
-                
-                # Translate back
-                lng_final = lng_scaled + centroid.x
-                lat_final = lat_scaled + centroid.y
-                
-                building_coords.append([lat_final, lng_final])
-            
-            return building_coords
+            # Scale the polygon around its centroid in one vectorized affine step
+            scaled = (pts - center) * scale_factor + center
+            
+            # Output is [lat, lng] per vertex
+            return scaled[:, ::-1].tolist()
             
         except Exception as e:
             app_logger.error(f"Building footprint creation error: {str(e)}")
             return self._create_fallback_footprint(coords)
     
+    def _generate_cache_key(self, site_coords: List[Dict], buildable_area: Dict[str, Any],
+                            building_params: Dict[str, Any]) -> str:
+        """Generate a cache key from the building generation inputs"""
+        key_string = json.dumps([site_coords, buildable_area, building_params], sort_keys=True, default=str)
+        return hashlib.blake2b(key_string.encode(), digest_size=16).hexdigest()
+    
+    def _polygon_centroid(self, pts: np.ndarray) -> np.ndarray:
+        """Area-weighted centroid of a polygon ring (shoelace), without building a GEOS geometry"""
+        # Shift to the first vertex so the cross products stay well conditioned
+        origin = pts[0]
+        x = pts[:, 0] - origin[0]
+        y = pts[:, 1] - origin[1]
+        x_next = np.roll(x, -1)
+        y_next = np.roll(y, -1)
+        cross = x * y_next - x_next * y
+        
+        twice_area = cross.sum()
+        if twice_area == 0:
+            # Degenerate ring; fall back to the vertex mean
+            return pts.mean(axis=0)
+        
+        cx = ((x + x_next) * cross).sum() / (3.0 * twice_area)
+        cy = ((y + y_next) * cross).sum() / (3.0 * twice_area)
+        return origin + np.array([cx, cy])
+    
     def save_building_design(self, building_data: Dict[str, Any], site_id: str) -> Dict[str, Any]:
         """Save 3D building design"""
         try:
@@ -133,6 +170,7 @@ class BuildingService(BaseService):
             # For now, we'll return success
             
             self._log_operation("Building design saved", f"Site {site_id}")
+            self.clear_cache()
             
             return {
                 'success': True,
@@ -147,26 +185,33 @@ class BuildingService(BaseService):
     
     def _estimate_buildable_area(self, site_coords: List[Dict]) -> float:
         """Estimate buildable area from site coordinates"""
+        if not site_coords or len(site_coords) < 3:
+            return FALLBACK_BUILDABLE_AREA_M2
+        
         try:
-            from shapely.geometry import Polygon
-            site_polygon = Polygon([(coord['lng'], coord['lat']) for coord in site_coords])
-            return site_polygon.area * (111320 ** 2) * 0.7  # Rough approximation
-        except:
-            return 200  # Fallback
+            lng = np.fromiter((coord['lng'] for coord in site_coords), dtype=np.float64)
+            lat = np.fromiter((coord['lat'] for coord in site_coords), dtype=np.float64)
+        except (KeyError, TypeError, ValueError):
+            return FALLBACK_BUILDABLE_AREA_M2
+        
+        # Shoelace formula, shifted to the first vertex to avoid cancellation
+        x = lng - lng[0]
+        y = lat - lat[0]
+        area_deg2 = 0.5 * abs(np.dot(x, np.roll(y, -1)) - np.dot(np.roll(x, -1), y))
+        return area_deg2 * DEG2_TO_M2 * USABLE_FRACTION  # Rough approximation
     
     def _create_fallback_footprint(self, coords: List) -> List[List[float]]:
         """Create a simple rectangular footprint as fallback"""
         if coords and len(coords) >= 3:
-            center_lat = sum(coord.get('lat', coord[0] if isinstance(coord, list) else 0) for coord in coords) / len(coords)
-            center_lng = sum(coord.get('lng', coord[1] if isinstance(coord, list) else 0) for coord in coords) / len(coords)
+            # Normalize to (lat, lng) rows once, then average both axes together
+            pts = np.array([
+                (coord.get('lat', 0), coord.get('lng', 0)) if isinstance(coord, dict) else (coord[0], coord[1])
+                for coord in coords
+            ], dtype=np.float64)
+            center = pts.mean(axis=0)
             
             offset = 0.0001
-            return [
-                [center_lat - offset, center_lng - offset],
-                [center_lat - offset, center_lng + offset],
-                [center_lat + offset, center_lng + offset],
-                [center_lat + offset, center_lng - offset]
-            ]
+            return (center + FALLBACK_FOOTPRINT_CORNERS * offset).tolist()
         
         return []
 
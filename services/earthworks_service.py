@@ -2,12 +2,15 @@
 """
 Earthworks Service - Handles cut/fill calculations for building platforms
 """
+import hashlib
+import threading
 import numpy as np
 from typing import Dict, Any, List, Optional, Tuple
 from .base_service import BaseService
 
 # Try to import geospatial dependencies with graceful fallback
 try:
+    import shapely
     from shapely.geometry import Polygon, Point
     from shapely.ops import transform as shapely_transform
     from pyproj import Transformer
@@ -18,14 +21,67 @@ except ImportError:
     GEOSPATIAL_AVAILABLE = False
 
 
+# Terrain grid keys, in the order _terrain_arrays returns them
+TERRAIN_GRID_KEYS = ('elevation_data', 'x_coords', 'y_coords')
+
+# Interpolators kept for repeat requests on the same terrain (e.g. FFL tweaks in the viewer)
+TERRAIN_INTERPOLATOR_CACHE_SIZE = 8
+
+# Cut/fill visualisation point, one record per graded cell (field order as in the response)
+CUT_FILL_POINT_DTYPE = np.dtype([
+    ('x', 'f8'), ('y', 'f8'),
+    ('z_terrain', 'f8'), ('z_target', 'f8'), ('z_engineered', 'f8'),
+    ('depth', 'f8'), ('engineered_depth', 'f8'),
+    ('type', 'U4'), ('intensity', 'U7'),
+    ('volume', 'f8'), ('area', 'f8'),
+    ('slope_type', 'U23'),
+    ('row', 'i8'), ('col', 'i8'),
+])
+
+# Depth classes (m) for earthwork intensity and slope treatment; np.digitize indexes the labels
+INTENSITY_DEPTHS = (0.2, 1.0, 2.0)
+INTENSITIES = np.array(['minimal', 'light', 'medium', 'heavy'])
+SLOPE_TYPE_DEPTHS = (0.5, 1.5, 3.0)
+SLOPE_TYPES = np.array(['minimal_grading', 'standard_slope', 'engineered_slope', 'retaining_wall_required'])
+
+# Fraction of a cell below which a platform's span is treated as rounding error
+GRID_SPAN_TOLERANCE = 1e-9
+
+# Per-cell arrays of the cut/fill grid, one entry per cell with terrain under the platform
+# (row indexes x, col indexes y)
+CELL_FIELDS = ('row', 'col', 'x', 'y', 'terrain_elevation', 'cut_fill_depth', 'area', 'volume',
+               'engineered_depth')
+
+
+def _reduce_cut_fill(depth: np.ndarray, volume: np.ndarray) -> Tuple[float, float, float]:
+    """(cut, fill, net) volumes from per-cell cut/fill depths and signed cell volumes"""
+    # Cut where terrain is above FFL, fill elsewhere; masked reduction, no gathered copies
+    net_volume = float(volume.sum())
+    cut_volume = float(np.sum(volume, where=depth > 0))
+    return cut_volume, cut_volume - net_volume, net_volume
+
+
 class EarthworksService(BaseService):
     """Service for calculating earthworks (cut/fill) for building platforms"""
 
     def __init__(self):
         super().__init__("EarthworksService")
         self.available = GEOSPATIAL_AVAILABLE
+        # Last terrain seen, as (source lists, arrays) and (arrays, interpolator): repeat
+        # calls with the same terrain skip list conversion and terrain hashing
+        self._last_terrain = None
+        self._last_interpolator = None
+        # WGS84 -> NZTM transformer, shared by every lat/lng platform
+        self._wgs84_to_nztm_transformer = None
+        # The service is a shared singleton under threaded Flask; guards the interpolator LRU
+        self._interpolator_lock = threading.Lock()
 
         if self.available:
+            # Pay PROJ's one-off setup at startup rather than on the first earthworks request
+            try:
+                self._wgs84_to_nztm()
+            except Exception as e:
+                self.logger.warning(f"NZTM transformer setup deferred to first use: {e}")
             self.logger.info("Earthworks service initialized successfully")
         else:
             self.logger.warning("Earthworks service unavailable - missing geospatial dependencies")
@@ -50,12 +106,11 @@ class EarthworksService(BaseService):
                 return {'success': False, 'error': 'Platform requires at least 3 coordinate points'}
 
             # Extract terrain data
-            elevation_data = np.array(terrain_data['elevation_data'])
-            x_coords = np.array(terrain_data['x_coords'])
-            y_coords = np.array(terrain_data['y_coords'])
+            elevation_data, x_coords, y_coords = self._terrain_arrays(terrain_data)
             base_level = terrain_data.get('base_level', 0)
             
-            self.logger.info(f"Terrain data: {elevation_data.shape}, base level: {base_level}")
+            if self.logger.is_enabled_for('DEBUG'):
+                self.logger.debug(f"Terrain data: {elevation_data.shape}, base level: {base_level}")
 
             # Convert platform coordinates to local coordinate system
             platform_local = self._convert_platform_to_local(platform_coords, terrain_data)
@@ -66,8 +121,8 @@ class EarthworksService(BaseService):
             platform_polygon = Polygon(platform_local)
             platform_bounds = platform_polygon.bounds
             
-            self.logger.info(f"Platform bounds: {platform_bounds}")
-            self.logger.info(f"Platform area: {platform_polygon.area:.2f}")
+            if self.logger.is_enabled_for('DEBUG'):
+                self.logger.debug(f"Platform bounds: {platform_bounds}, area: {platform_polygon.area:.2f}")
             
             # Validate polygon is not degenerate
             if platform_polygon.area < 1.0:  # Less than 1 square meter
@@ -76,6 +131,9 @@ class EarthworksService(BaseService):
                     'error': f'Platform polygon is degenerate (area: {platform_polygon.area:.2f}m²). Check coordinate conversion.'
                 }
 
+            # Prepare once: every containment/overlap query below runs against this polygon
+            shapely.prepare(platform_polygon)
+
             # Create interpolation function for terrain elevation
             terrain_interpolator = self._create_terrain_interpolator(x_coords, y_coords, elevation_data)
             
@@ -111,7 +169,7 @@ class EarthworksService(BaseService):
                 'net_earthwork_m3': cut_fill_result['net_volume'],
                 'platform_area_m2': platform_polygon.area,
                 'earthwork_type': 'net_cut' if cut_fill_result['net_volume'] > 0 else 'net_fill',
-                'cut_fill_grid': cut_fill_result['grid_data'],
+                'cut_fill_grid': self._grid_records(cut_fill_result, ffl),
                 'visualization_data': visualisation_data,
                 'calculation_details': {
                     'grid_resolution_m': 1.0,
@@ -133,117 +191,61 @@ class EarthworksService(BaseService):
         """Convert platform coordinates to local terrain coordinate system"""
         try:
             # Get terrain coordinate ranges
-            x_coords = np.array(terrain_data['x_coords'])
-            y_coords = np.array(terrain_data['y_coords'])
+            _, x_coords, y_coords = self._terrain_arrays(terrain_data)
             
             x_min, x_max = x_coords.min(), x_coords.max()
             y_min, y_max = y_coords.min(), y_coords.max()
-            
-            platform_local = []
-            self.logger.info(f"Converting {len(platform_coords)} platform coordinates from: {platform_coords}")
-            self.logger.info(f"Terrain coordinate ranges: x({x_min:.1f} to {x_max:.1f}), y({y_min:.1f} to {y_max:.1f})")
-            
-            for i, coord in enumerate(platform_coords):
-                if isinstance(coord, dict):
-                    # Dictionary format with x, y keys (from buildable area or relative coordinates)
-                    x_val = coord.get('x', 0)
-                    y_val = coord.get('y', 0)
-                    self.logger.info(f"Coord {i}: dict format x={x_val}, y={y_val}")
-                    
-                    # Check if these are lat/lng coordinates (buildable area format)
-                    if abs(x_val) > 2 and abs(y_val) > 2:  # Likely lat/lng coordinates
-                        self.logger.info(f"Processing lat/lng coordinate: lng={x_val}, lat={y_val}")
-                        
-                        # Get site coordinates for reference - use the first site coordinate as reference point
-                        site_coords = terrain_data.get('coordinates', {})
-                        if site_coords and hasattr(site_coords, 'get'):
-                            ref_lat = site_coords.get('lat', -41.28)
-                            ref_lng = site_coords.get('lng', 174.73)
-                        else:
-                            # Fallback to approximate center of Wellington
-                            ref_lat = -41.28
-                            ref_lng = 174.73
-                        
-                        self.logger.info(f"Using reference point: lat={ref_lat}, lng={ref_lng}")
-                        
-                        # Convert lat/lng difference to meters (approximate)
-                        # 1 degree longitude ≈ 111320 * cos(lat) meters
-                        # 1 degree latitude ≈ 111320 meters
-                        lat_diff = y_val - ref_lat
-                        lng_diff = x_val - ref_lng
-                        
-                        # Convert to approximate meters
-                        import math
-                        y_meters = lat_diff * 111320
-                        x_meters = lng_diff * 111320 * math.cos(math.radians(ref_lat))
-                        
-                        self.logger.info(f"Coordinate offset in meters: x={x_meters:.1f}m, y={y_meters:.1f}m")
-                        
-                        # Convert meters to relative coordinates within terrain bounds
-                        terrain_width = x_max - x_min
-                        terrain_height = y_max - y_min
-                        
-                        # Place relative to terrain center with offset
-                        x_rel = 0.5 + (x_meters / terrain_width)
-                        y_rel = 0.5 + (y_meters / terrain_height)
-                        
-                        self.logger.info(f"Calculated relative coordinates: x_rel={x_rel:.3f}, y_rel={y_rel:.3f}")
-                        self.logger.info(f"Terrain dimensions: width={terrain_width:.1f}m, height={terrain_height:.1f}m")
-                    else:
-                        # Assume relative coordinates (0-1 range)
-                        x_rel = x_val
-                        y_rel = y_val
-                        
+            terrain_width = x_max - x_min
+            terrain_height = y_max - y_min
+            
+            # Only format the raw coordinates when debug output is enabled
+            if self.logger.is_enabled_for('DEBUG'):
+                self.logger.debug(f"Converting {len(platform_coords)} platform coordinates from: {platform_coords}")
+                self.logger.debug(f"Terrain coordinate ranges: x({x_min:.1f} to {x_max:.1f}), y({y_min:.1f} to {y_max:.1f})")
+            
+            # Dicts carry x, y keys (buildable area or relative coordinates); lists are [x, y] or [lng, lat]
+            coords = np.array([
+                (coord.get('x', 0), coord.get('y', 0)) if isinstance(coord, dict)
+                else (coord[0] if len(coord) > 0 else 0, coord[1] if len(coord) > 1 else 0)
+                for coord in platform_coords
+            ], dtype=float)
+            if not np.isfinite(coords).all():
+                raise ValueError("Platform coordinates must be finite numbers")
+            
+            x_rel, y_rel = coords[:, 0].copy(), coords[:, 1].copy()
+            
+            # Beyond +/-2 on both axes the point is lat/lng; otherwise it is already relative (0-1 range)
+            is_lat_lng = (np.abs(x_rel) > 2) & (np.abs(y_rel) > 2)
+            if is_lat_lng.any():
+                # Use the site coordinates as reference point, else the approximate center of Wellington
+                site_coords = terrain_data.get('coordinates', {})
+                if site_coords and hasattr(site_coords, 'get'):
+                    ref_lat = site_coords.get('lat', -41.28)
+                    ref_lng = site_coords.get('lng', 174.73)
                 else:
-                    # List format [x, y] or [lng, lat]
-                    x_val = coord[0] if len(coord) > 0 else 0
-                    y_val = coord[1] if len(coord) > 1 else 0
-                    self.logger.info(f"Coord {i}: list format x={x_val}, y={y_val}")
-                    
-                    # Check if these are lat/lng coordinates
-                    if abs(x_val) > 2 and abs(y_val) > 2:  # Likely lat/lng coordinates
-                        self.logger.info(f"Processing lat/lng coordinate (list): lng={x_val}, lat={y_val}")
-                        
-                        # Get site coordinates for reference
-                        site_coords = terrain_data.get('coordinates', {})
-                        if site_coords and hasattr(site_coords, 'get'):
-                            ref_lat = site_coords.get('lat', -41.28)
-                            ref_lng = site_coords.get('lng', 174.73)
-                        else:
-                            ref_lat = -41.28
-                            ref_lng = 174.73
-                        
-                        # Convert lat/lng difference to meters
-                        lat_diff = y_val - ref_lat
-                        lng_diff = x_val - ref_lng
-                        
-                        import math
-                        y_meters = lat_diff * 111320
-                        x_meters = lng_diff * 111320 * math.cos(math.radians(ref_lat))
-                        
-                        # Convert meters to relative coordinates within terrain bounds
-                        terrain_width = x_max - x_min
-                        terrain_height = y_max - y_min
-                        
-                        x_rel = 0.5 + (x_meters / terrain_width)
-                        y_rel = 0.5 + (y_meters / terrain_height)
-                        
-                        self.logger.info(f"List format - relative coordinates: x_rel={x_rel:.3f}, y_rel={y_rel:.3f}")
-                    else:
-                        # Assume relative coordinates
-                        x_rel = x_val
-                        y_rel = y_val
+                    ref_lat = -41.28
+                    ref_lng = 174.73
                 
-                # Convert to local terrain coordinates
-                # Ensure we have valid relative coordinates (0-1 range)
-                x_rel = max(0.0, min(1.0, x_rel))
-                y_rel = max(0.0, min(1.0, y_rel))
+                if self.logger.is_enabled_for('DEBUG'):
+                    self.logger.debug(f"Converting {int(is_lat_lng.sum())} lat/lng coordinates about reference point: lat={ref_lat}, lng={ref_lng}")
                 
-                x_local = x_min + (x_rel * (x_max - x_min))
-                y_local = y_min + (y_rel * (y_max - y_min))
+                # Project the vertices and the reference point to NZTM, the terrain's CRS,
+                # in one batch; offsets from the reference point are then in meters
+                eastings, northings = self._wgs84_to_nztm().transform(
+                    np.append(x_rel[is_lat_lng], ref_lng), np.append(y_rel[is_lat_lng], ref_lat)
+                )
+                x_meters = eastings[:-1] - eastings[-1]
+                y_meters = northings[:-1] - northings[-1]
                 
-                self.logger.info(f"Coordinate conversion: rel({x_rel:.3f}, {y_rel:.3f}) -> local({x_local:.1f}, {y_local:.1f})")
-                platform_local.append((x_local, y_local))
+                # Place relative to terrain center with offset
+                x_rel[is_lat_lng] = 0.5 + (x_meters / terrain_width)
+                y_rel[is_lat_lng] = 0.5 + (y_meters / terrain_height)
+            
+            # Convert to local terrain coordinates
+            # Ensure we have valid relative coordinates (0-1 range)
+            x_local = x_min + (np.clip(x_rel, 0.0, 1.0) * terrain_width)
+            y_local = y_min + (np.clip(y_rel, 0.0, 1.0) * terrain_height)
+            platform_local = list(zip(x_local.tolist(), y_local.tolist()))
             
             self.logger.info(f"Converted {len(platform_coords)} platform coordinates to local system")
             return platform_local
@@ -252,49 +254,122 @@ class EarthworksService(BaseService):
             self.logger.error(f"Failed to convert platform coordinates: {e}")
             return []
 
+    def _terrain_arrays(self, terrain_data: Dict[str, Any]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Elevation, x and y grids as arrays, reused while the caller passes the same terrain lists"""
+        sources = tuple(terrain_data[key] for key in TERRAIN_GRID_KEYS)
+        last = self._last_terrain
+        if last is not None and all(source is last_source for source, last_source in zip(sources, last[0])):
+            return last[1]
+        
+        # float32 holds LiDAR terrain to well under its ~1 cm accuracy at half the memory traffic;
+        # sampled elevations are widened to float64 before any volume arithmetic
+        arrays = tuple(np.array(source, dtype=np.float32) for source in sources)
+        self._last_terrain = (sources, arrays)
+        return arrays
+
+    def _wgs84_to_nztm(self) -> 'Transformer':
+        """Shared lng/lat to NZTM (EPSG:2193) transformer; terrain grids are NZTM rasters"""
+        if self._wgs84_to_nztm_transformer is None:
+            self._wgs84_to_nztm_transformer = Transformer.from_crs("EPSG:4326", "EPSG:2193", always_xy=True)
+        return self._wgs84_to_nztm_transformer
+
     def _create_terrain_interpolator(self, x_coords: np.ndarray, y_coords: np.ndarray, elevation_data: np.ndarray):
-        """Create interpolation function for terrain elevation"""
+        """Terrain interpolator memoized per terrain content, with LRU eviction"""
+        # Same arrays as last time (see _terrain_arrays): skip hashing the terrain
+        last = self._last_interpolator
+        if last is not None and all(array is last_array for array, last_array in
+                                    zip((elevation_data, x_coords, y_coords), last[0])):
+            return last[1]
+        
+        key = ('terrain_interpolator', self._terrain_digest(x_coords, y_coords, elevation_data))
+        with self._interpolator_lock:
+            interpolator = self._cache.pop(key, None)
+            if interpolator is not None:
+                # Re-insert so dict order tracks recency
+                self._cache[key] = interpolator
+
+        if interpolator is None:
+            # Built outside the lock so requests on other terrain are not held up
+            interpolator = self._build_terrain_interpolator(x_coords, y_coords, elevation_data)
+            if interpolator is None:
+                return None
+            with self._interpolator_lock:
+                self._cache[key] = interpolator
+                while len(self._cache) > TERRAIN_INTERPOLATOR_CACHE_SIZE:
+                    self._cache.pop(next(iter(self._cache)))
+        
+        self._last_interpolator = ((elevation_data, x_coords, y_coords), interpolator)
+        return interpolator
+
+    @staticmethod
+    def _terrain_digest(*arrays: np.ndarray) -> str:
+        """Content hash of the terrain arrays (shape, dtype and values)"""
+        digest = hashlib.blake2b(digest_size=16)
+        for array in arrays:
+            digest.update(f"{array.shape}{array.dtype.str}".encode())
+            digest.update(np.ascontiguousarray(array).data)
+        return digest.hexdigest()
+
+    def _build_terrain_interpolator(self, x_coords: np.ndarray, y_coords: np.ndarray, elevation_data: np.ndarray):
+        """Create interpolation function for terrain elevation, called with an (N, 2) array of x, y points"""
         try:
-            # Flatten coordinate arrays
-            x_flat = x_coords.flatten()
-            y_flat = y_coords.flatten()
-            z_flat = elevation_data.flatten()
-            
-            # Remove NaN values
+            # LiDAR terrain arrives as a regular grid: bilinear lookup needs no triangulation,
+            # and NaN holes simply propagate to the samples that touch them
+            axes = self._regular_grid_axes(x_coords, y_coords, elevation_data)
+            if axes is not None:
+                x_axis, y_axis = axes
+                return interpolate.RegularGridInterpolator(
+                    (x_axis, y_axis), elevation_data.T, bounds_error=False, fill_value=np.nan
+                )
+            
+            # Genuinely scattered terrain: triangulate the non-NaN points
+            z_flat = elevation_data.reshape(-1)
             valid_mask = ~np.isnan(z_flat)
-            x_valid = x_flat[valid_mask]
-            y_valid = y_flat[valid_mask]
-            z_valid = z_flat[valid_mask]
-            
-            # Create interpolator
-            interpolator = interpolate.LinearNDInterpolator(
-                np.column_stack([x_valid, y_valid]), z_valid, fill_value=np.nan
+            return interpolate.LinearNDInterpolator(
+                np.column_stack([x_coords.reshape(-1)[valid_mask], y_coords.reshape(-1)[valid_mask]]),
+                z_flat[valid_mask], fill_value=np.nan
             )
             
-            return interpolator
-            
         except Exception as e:
             self.logger.error(f"Failed to create terrain interpolator: {e}")
             return None
 
+    @staticmethod
+    def _regular_grid_axes(x_coords: np.ndarray, y_coords: np.ndarray,
+                           elevation_data: np.ndarray) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """1-D x and y axes when the terrain is a regular (rows along y, columns along x) grid, else None"""
+        if elevation_data.ndim != 2:
+            return None
+        
+        if x_coords.ndim == 1 and y_coords.ndim == 1:
+            x_axis, y_axis = x_coords, y_coords
+        elif x_coords.shape == y_coords.shape == elevation_data.shape:
+            x_axis, y_axis = x_coords[0], y_coords[:, 0]
+            # Every row must repeat the x axis and every column the y axis
+            if not (np.array_equal(x_coords, np.broadcast_to(x_axis, x_coords.shape)) and
+                    np.array_equal(y_coords, np.broadcast_to(y_axis[:, None], y_coords.shape))):
+                return None
+        else:
+            return None
+        
+        if elevation_data.shape != (len(y_axis), len(x_axis)) or len(x_axis) < 2 or len(y_axis) < 2:
+            return None
+        
+        # Axes must be strictly monotonic (LiDAR rows usually run north to south)
+        for axis in (x_axis, y_axis):
+            steps = np.diff(axis)
+            if not ((steps > 0).all() or (steps < 0).all()):
+                return None
+        
+        return x_axis, y_axis
+
     def _calculate_optimal_ffl(self, platform_polygon: Polygon, terrain_interpolator) -> float:
         """Calculate optimal FFL that minimizes total cut+fill volume"""
         try:
             # Sample elevations within platform
-            bounds = platform_polygon.bounds
-            x_samples = np.linspace(bounds[0], bounds[2], 20)
-            y_samples = np.linspace(bounds[1], bounds[3], 20)
-            
-            elevations = []
-            for x in x_samples:
-                for y in y_samples:
-                    point = Point(x, y)
-                    if platform_polygon.contains(point):
-                        elevation = terrain_interpolator(x, y)
-                        if not np.isnan(elevation):
-                            elevations.append(elevation)
+            elevations = self._sample_platform_elevations(platform_polygon, terrain_interpolator, 20)
             
-            if elevations:
+            if elevations.size:
                 # Use median as optimal FFL (minimizes total earthwork)
                 return float(np.median(elevations))
             else:
@@ -307,91 +382,92 @@ class EarthworksService(BaseService):
     def _calculate_average_elevation(self, platform_polygon: Polygon, terrain_interpolator) -> float:
         """Calculate average elevation within platform"""
         try:
-            bounds = platform_polygon.bounds
-            x_samples = np.linspace(bounds[0], bounds[2], 10)
-            y_samples = np.linspace(bounds[1], bounds[3], 10)
-            
-            elevations = []
-            for x in x_samples:
-                for y in y_samples:
-                    point = Point(x, y)
-                    if platform_polygon.contains(point):
-                        elevation = terrain_interpolator(x, y)
-                        if not np.isnan(elevation):
-                            elevations.append(elevation)
+            elevations = self._sample_platform_elevations(platform_polygon, terrain_interpolator, 10)
             
-            return float(np.mean(elevations)) if elevations else 0.0
+            return float(np.mean(elevations)) if elevations.size else 0.0
             
         except Exception as e:
             self.logger.error(f"Failed to calculate average elevation: {e}")
             return 0.0
 
+    @classmethod
+    def _sample_platform_elevations(cls, platform_polygon: Polygon, terrain_interpolator,
+                                    samples_per_axis: int) -> np.ndarray:
+        """Terrain elevations on an evenly spaced grid over the platform, NaN samples dropped"""
+        bounds = platform_polygon.bounds
+        sample_x, sample_y = (grid.ravel() for grid in np.meshgrid(
+            np.linspace(bounds[0], bounds[2], samples_per_axis),
+            np.linspace(bounds[1], bounds[3], samples_per_axis),
+            indexing='ij'
+        ))
+        
+        # One vectorized point-in-polygon test, then one interpolator call
+        inside = shapely.contains_xy(platform_polygon, sample_x, sample_y)
+        elevations = cls._interpolate_elevations(terrain_interpolator, sample_x[inside], sample_y[inside])
+        return elevations[~np.isnan(elevations)]
+
+    @staticmethod
+    def _interpolate_elevations(terrain_interpolator, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+        """Interpolated terrain elevations at many points, batched into a single interpolator call"""
+        if not len(x):
+            return np.empty(0)
+        return np.asarray(terrain_interpolator(np.column_stack([x, y])), dtype=float).reshape(-1)
+
     def _calculate_cut_fill_volumes(self, platform_polygon: Polygon, terrain_interpolator, 
                                   ffl: float, resolution: float = 1.0) -> Dict[str, Any]:
         """Calculate cut/fill volumes using grid method"""
         try:
             bounds = platform_polygon.bounds
             
-            # Create grid
-            x_range = np.arange(bounds[0], bounds[2] + resolution, resolution)
-            y_range = np.arange(bounds[1], bounds[3] + resolution, resolution)
-            
-            cut_volume = 0.0
-            fill_volume = 0.0
-            grid_data = []
-            
-            for i, x in enumerate(x_range[:-1]):
-                grid_row = []
-                for j, y in enumerate(y_range[:-1]):
-                    # Create cell polygon
-                    cell_coords = [
-                        (x, y),
-                        (x + resolution, y),
-                        (x + resolution, y + resolution),
-                        (x, y + resolution)
-                    ]
-                    cell_polygon = Polygon(cell_coords)
-                    
-                    # Check if cell intersects with platform
-                    intersection = cell_polygon.intersection(platform_polygon)
-                    if intersection.area > 0:
-                        # Calculate center point elevation
-                        center_x = x + resolution / 2
-                        center_y = y + resolution / 2
-                        terrain_elevation = terrain_interpolator(center_x, center_y)
-                        
-                        if not np.isnan(terrain_elevation):
-                            # Calculate cut/fill depth
-                            depth_diff = terrain_elevation - ffl
-                            cell_area = intersection.area
-                            
-                            if depth_diff > 0:  # Cut required
-                                cut_volume += depth_diff * cell_area
-                            else:  # Fill required
-                                fill_volume += abs(depth_diff) * cell_area
-                            
-                            grid_row.append({
-                                'x': center_x,
-                                'y': center_y,
-                                'terrain_elevation': float(terrain_elevation),
-                                'target_elevation': float(ffl),
-                                'cut_fill_depth': float(depth_diff),
-                                'area': float(cell_area),
-                                'volume': float(depth_diff * cell_area)
-                            })
-                        else:
-                            grid_row.append(None)
-                    else:
-                        grid_row.append(None)
-                
-                if grid_row:
-                    grid_data.append(grid_row)
+            # Create grid from integer cell counts; a float-step arange can overshoot by a
+            # sliver cell when the span is a whole number of cells
+            nx = max(int(np.ceil((bounds[2] - bounds[0]) / resolution - GRID_SPAN_TOLERANCE)), 0)
+            ny = max(int(np.ceil((bounds[3] - bounds[1]) / resolution - GRID_SPAN_TOLERANCE)), 0)
+            x_edges = bounds[0] + np.arange(nx) * resolution
+            y_edges = bounds[1] + np.arange(ny) * resolution
+            
+            # Cell origins, rows along x and columns along y
+            cell_x, cell_y = np.meshgrid(x_edges, y_edges, indexing='ij')
+            
+            # Cells wholly inside the platform contribute their full area; only cells on
+            # the platform edge need an actual polygon clip
+            cell_boxes = shapely.box(cell_x, cell_y, cell_x + resolution, cell_y + resolution)
+            interior = shapely.covers(platform_polygon, cell_boxes)
+            edge = shapely.intersects(platform_polygon, cell_boxes) & ~interior
+            cell_area = np.zeros(cell_boxes.shape)
+            cell_area[interior] = resolution * resolution
+            cell_area[edge] = shapely.area(shapely.intersection(cell_boxes[edge], platform_polygon))
+            
+            # Sample terrain at the centres of cells that overlap the platform, in one call
+            overlap = cell_area > 0
+            rows, cols = np.nonzero(overlap)
+            center_x = (x_edges + resolution / 2)[rows]
+            center_y = (y_edges + resolution / 2)[cols]
+            terrain_elevation = self._interpolate_elevations(terrain_interpolator, center_x, center_y)
+            
+            valid = ~np.isnan(terrain_elevation)
+            depth_diff = terrain_elevation[valid] - ffl
+            area = cell_area[overlap][valid]
+            volume = depth_diff * area
+            cut_volume, fill_volume, net_volume = _reduce_cut_fill(depth_diff, volume)
+            
+            center_x, center_y = center_x[valid], center_y[valid]
+            
+            # Apply slope grading for realistic earthworks in the same pass, measuring every
+            # cell's distance to the platform edge in one vectorized call
+            distance_to_edge = shapely.distance(platform_polygon.exterior, shapely.points(center_x, center_y))
+            engineered_depth = self._apply_slope_grading(depth_diff, distance_to_edge)
+            
+            # Struct-of-arrays cells, in row-major grid order
+            cells = dict(zip(CELL_FIELDS, (rows[valid], cols[valid], center_x, center_y, terrain_elevation[valid],
+                                           depth_diff, area, volume, engineered_depth)))
             
             return {
                 'cut_volume': cut_volume,
                 'fill_volume': fill_volume,
-                'net_volume': cut_volume - fill_volume,
-                'grid_data': grid_data
+                'net_volume': net_volume,
+                'cells': cells,
+                'grid_shape': cell_boxes.shape
             }
             
         except Exception as e:
@@ -400,9 +476,33 @@ class EarthworksService(BaseService):
                 'cut_volume': 0.0,
                 'fill_volume': 0.0,
                 'net_volume': 0.0,
-                'grid_data': []
+                'cells': None,
+                'grid_shape': (0, 0)
             }
 
+    @staticmethod
+    def _grid_records(cut_fill_result: Dict[str, Any], ffl: float) -> List[List[Optional[Dict[str, float]]]]:
+        """Per-cell dicts for the API response, None for cells without cut/fill"""
+        cells = cut_fill_result.get('cells')
+        if cells is None:
+            return []
+        
+        nrows, ncols = cut_fill_result['grid_shape']
+        records = [[None] * ncols for _ in range(nrows)]
+        target_elevation = float(ffl)
+        fields = ('row', 'col', 'x', 'y', 'terrain_elevation', 'cut_fill_depth', 'area', 'volume')
+        for i, j, x, y, z, d, a, v in zip(*(cells[field].tolist() for field in fields)):
+            records[i][j] = {
+                'x': x,
+                'y': y,
+                'terrain_elevation': z,
+                'target_elevation': target_elevation,
+                'cut_fill_depth': d,
+                'area': a,
+                'volume': v
+            }
+        return records
+
     def _create_visualisation_data(self, platform_polygon: Polygon, ffl: float, 
                                  cut_fill_result: Dict[str, Any], terrain_data: Dict[str, Any]) -> Dict[str, Any]:
         """Create data structure for 3D visualisation with realistic engineering practices"""
@@ -418,46 +518,8 @@ class EarthworksService(BaseService):
             }
             
             # Cut/fill visualisation data with detailed grid information
-            cut_fill_viz = []
-            grid_data = cut_fill_result.get('grid_data', [])
-            
-            for row_idx, row in enumerate(grid_data):
-                for col_idx, cell in enumerate(row):
-                    if cell and cell['area'] > 0:  # Only include cells with actual area
-                        # Apply slope grading for realistic earthworks
-                        engineered_depth = self._apply_slope_grading(
-                            cell['cut_fill_depth'], cell['x'], cell['y'], platform_polygon
-                        )
-                        
-                        # Determine earthwork type and intensity
-                        cut_fill_type = 'cut' if cell['cut_fill_depth'] > 0 else 'fill'
-                        depth_magnitude = abs(cell['cut_fill_depth'])
-                        
-                        # Classify intensity
-                        if depth_magnitude > 2.0:
-                            intensity = 'heavy'
-                        elif depth_magnitude > 1.0:
-                            intensity = 'medium'
-                        elif depth_magnitude > 0.2:
-                            intensity = 'light'
-                        else:
-                            intensity = 'minimal'
-                        
-                        cut_fill_viz.append({
-                            'x': cell['x'],
-                            'y': cell['y'],
-                            'z_terrain': cell['terrain_elevation'],
-                            'z_target': cell['target_elevation'],
-                            'z_engineered': cell['terrain_elevation'] - engineered_depth,
-                            'depth': cell['cut_fill_depth'],
-                            'engineered_depth': engineered_depth,
-                            'type': cut_fill_type,
-                            'intensity': intensity,
-                            'volume': abs(cell['volume']),
-                            'area': cell['area'],
-                            'slope_type': self._determine_slope_type(engineered_depth),
-                            'grid_position': {'row': row_idx, 'col': col_idx}
-                        })
+            cells = cut_fill_result.get('cells')
+            cut_fill_viz = [] if cells is None else self._cut_fill_point_records(self._cut_fill_points(cells, ffl))
             
             # Create platform boundary at FFL for 3D visualization
             platform_boundary_3d = {
@@ -485,6 +547,55 @@ class EarthworksService(BaseService):
             self.logger.error(f"Failed to create visualization data: {e}")
             return {}
 
+    def _cut_fill_points(self, cells: Dict[str, np.ndarray], ffl: float) -> np.ndarray:
+        """Visualisation points for the graded cells, as a CUT_FILL_POINT_DTYPE record array"""
+        depth = cells['cut_fill_depth']
+        engineered_depth = cells['engineered_depth']
+        
+        points = np.empty(len(depth), dtype=CUT_FILL_POINT_DTYPE)
+        points['x'] = cells['x']
+        points['y'] = cells['y']
+        points['z_terrain'] = cells['terrain_elevation']
+        points['z_target'] = ffl
+        points['z_engineered'] = cells['terrain_elevation'] - engineered_depth
+        points['depth'] = depth
+        points['engineered_depth'] = engineered_depth
+        
+        # Determine earthwork type and intensity
+        points['type'] = np.where(depth > 0, 'cut', 'fill')
+        # Intensity: light above 0.2m, medium above 1m, heavy above 2m
+        points['intensity'] = INTENSITIES[np.digitize(np.abs(depth), INTENSITY_DEPTHS, right=True)]
+        
+        points['volume'] = np.abs(cells['volume'])
+        points['area'] = cells['area']
+        points['slope_type'] = self._determine_slope_type(engineered_depth)
+        points['row'] = cells['row']
+        points['col'] = cells['col']
+        return points
+
+    @staticmethod
+    def _cut_fill_point_records(points: np.ndarray) -> List[Dict[str, Any]]:
+        """JSON-ready dicts for the visualisation points, built once at the response boundary"""
+        return [
+            {
+                'x': x,
+                'y': y,
+                'z_terrain': z_terrain,
+                'z_target': z_target,
+                'z_engineered': z_engineered,
+                'depth': depth,
+                'engineered_depth': engineered_depth,
+                'type': cut_fill_type,
+                'intensity': intensity,
+                'volume': volume,
+                'area': area,
+                'slope_type': slope_type,
+                'grid_position': {'row': row, 'col': col}
+            }
+            for (x, y, z_terrain, z_target, z_engineered, depth, engineered_depth, cut_fill_type,
+                 intensity, volume, area, slope_type, row, col) in points.tolist()
+        ]
+
     def _create_engineered_surface(self, platform_polygon: Polygon, ffl: float, 
                                  cut_fill_result: Dict[str, Any], terrain_data: Dict[str, Any]) -> Dict[str, Any]:
         """Create engineered surface with proper slopes and transitions"""
@@ -535,40 +646,18 @@ class EarthworksService(BaseService):
             self.logger.error(f"Failed to create engineered surface: {e}")
             return {}
 
-    def _apply_slope_grading(self, original_depth: float, x: float, y: float, platform_polygon: Polygon) -> float:
+    def _apply_slope_grading(self, original_depth: np.ndarray, distance_to_edge: np.ndarray) -> np.ndarray:
         """Apply realistic slope grading based on distance from platform edge"""
-        try:
-            point = Point(x, y)
-            distance_to_edge = platform_polygon.exterior.distance(point)
-            
-            # If we're at the platform edge, apply slope grading
-            if distance_to_edge <= 5.0:  # 5 meter influence zone
-                # Standard 3:1 slope (run:rise)
-                slope_ratio = 3.0
-                max_transition = min(abs(original_depth) / slope_ratio, distance_to_edge)
-                
-                if original_depth > 0:  # Cut
-                    # Gradual cut with slope
-                    return original_depth * (1 - (distance_to_edge / 5.0) * 0.7)
-                else:  # Fill
-                    # Gradual fill with slope
-                    return original_depth * (1 - (distance_to_edge / 5.0) * 0.5)
-            
-            return original_depth
-            
-        except Exception as e:
-            return original_depth
-
-    def _determine_slope_type(self, depth: float) -> str:
-        """Determine the type of slope treatment needed"""
-        if abs(depth) < 0.5:
-            return "minimal_grading"
-        elif abs(depth) < 1.5:
-            return "standard_slope"
-        elif abs(depth) < 3.0:
-            return "engineered_slope"
-        else:
-            return "retaining_wall_required"
+        # Within the 5 meter influence zone of the edge, cuts ease off by up to 70%
+        # and fills by up to 50% (standard 3:1 run:rise slope)
+        easing = np.where(original_depth > 0, 0.7, 0.5)
+        graded_depth = original_depth * (1 - (distance_to_edge / 5.0) * easing)
+        return np.where(distance_to_edge <= 5.0, graded_depth, original_depth)
+
+    def _determine_slope_type(self, depth: np.ndarray) -> np.ndarray:
+        """Determine the type of slope treatment needed for each depth"""
+        # Below 0.5m minimal grading, below 1.5m a standard slope, below 3m an engineered slope
+        return SLOPE_TYPES[np.digitize(np.abs(depth), SLOPE_TYPE_DEPTHS)]
 
     def _generate_engineering_notes(self, cut_fill_result: Dict[str, Any]) -> List[str]:
         """Generate engineering recommendations based on cut/fill analysis"""
@@ -586,9 +675,11 @@ class EarthworksService(BaseService):
         else:
             notes.append(f"⚠ Fill material needed: {abs(net_vol):.1f}m³ - source quality fill material")
         
-        # Slope stability recommendations
-        max_depth = max([max([cell['cut_fill_depth'] if cell else 0 for cell in row]) 
-                        for row in cut_fill_result.get('grid_data', [])])
+        # Slope stability recommendations, from the deepest cut in the grid
+        cells = cut_fill_result.get('cells')
+        max_depth = 0.0
+        if cells is not None:
+            max_depth = float(np.max(cells['cut_fill_depth'], initial=0.0))
         
         if max_depth > 3.0:
             notes.append("⚠ Deep cuts detected - consider retaining walls or terracing")
@@ -6,10 +6,19 @@ import cv2
 import numpy as np
 from PIL import Image, ImageEnhance, ImageFilter
 import base64
+import hashlib
 import io
+import threading
 from typing import Dict, Any, List, Tuple, Optional
 from .base_service import BaseService
 
+# Decoded uploads kept for repeat requests on the same image (e.g. retries from the upload UI),
+# bounded by total decoded bytes since one 4096x3072 frame alone is ~37 MB
+DECODED_IMAGE_CACHE_BYTES = 64 * 1024 * 1024
+
+# Boundary detection runs on a copy no larger than this on its long side; the polygon is coarse
+DETECTION_MAX_DIMENSION = 1024
+
 
 class FloorplanService(BaseService):
     """Service for processing floor plan images and extracting boundaries with improved accuracy"""
@@ -29,6 +38,15 @@ class FloorplanService(BaseService):
             'canny_lower': 30,
             'canny_upper': 100,
         }
+        # Flask serves requests on threads, so the decoded-image LRU and its byte total are locked
+        self._decode_lock = threading.Lock()
+        self._decoded_bytes = 0
+
+    def clear_cache(self) -> None:
+        """Clear service cache, including the decoded-image byte total"""
+        with self._decode_lock:
+            super().clear_cache()
+            self._decoded_bytes = 0
 
     def _ensure_json_serializable(self, data):
         """Convert numpy types to JSON serializable types"""
@@ -45,8 +63,10 @@ class FloorplanService(BaseService):
         else:
             return data
 
-    def process_floorplan_image(self, image_data: str, scale_reference: Optional[float] = None) -> Dict[str, Any]:
-        """Process uploaded floor plan image and extract boundary coordinates"""
+    def process_floorplan_image(self, image_data: str, scale_reference: Optional[float] = None,
+                                return_preview: bool = True) -> Dict[str, Any]:
+        """Process uploaded floor plan image and extract boundary coordinates, with an annotated
+        PNG preview unless return_preview is False"""
         try:
             self._log_operation("Floor plan processing started")
 
@@ -67,9 +87,10 @@ class FloorplanService(BaseService):
                 'boundaries': boundaries,
                 'coordinates': coordinates,
                 'metrics': metrics,
-                'processed_image': self._encode_processed_image(image, boundaries),
                 'processing_method': 'enhanced_cv'
             }
+            if return_preview:
+                result['processed_image'] = self._encode_processed_image(image, boundaries)
 
             result = self._ensure_json_serializable(result)
             self._log_operation("Floor plan processing completed", f"Found {len(boundaries)} boundary points")
@@ -85,35 +106,56 @@ class FloorplanService(BaseService):
             })
 
     def _decode_base64_image(self, image_data: str) -> np.ndarray:
-        """Decode base64 image data to numpy array"""
+        """Decode base64 image data to a read-only BGR array, memoized per upload with LRU eviction by size"""
+        # Remove data URL prefix if present
+        if image_data.startswith('data:image'):
+            image_data = image_data.split(',')[1]
+
+        key = ('decoded_image', hashlib.blake2b(image_data.encode(), digest_size=16).hexdigest())
+        with self._decode_lock:
+            image = self._cache.pop(key, None)
+            if image is not None:
+                # Re-insert so dict order tracks recency
+                self._cache[key] = image
+                return image
+
+        # Decoded outside the lock so other uploads are not serialised behind this one
+        image = self._decode_image_bytes(image_data)
+        # Shared between requests, so callers must copy before drawing on it
+        image.flags.writeable = False
+
+        with self._decode_lock:
+            # Another request may have decoded the same upload meanwhile
+            previous = self._cache.pop(key, None)
+            if previous is not None:
+                self._decoded_bytes -= previous.nbytes
+            self._cache[key] = image
+            self._decoded_bytes += image.nbytes
+            # Evict least recently used frames; an upload larger than the whole budget is not kept
+            while self._decoded_bytes > DECODED_IMAGE_CACHE_BYTES:
+                self._decoded_bytes -= self._cache.pop(next(iter(self._cache))).nbytes
+        return image
+
+    def _decode_image_bytes(self, image_data: str) -> np.ndarray:
+        """Decode base64 image data to a BGR numpy array"""
         try:
-            # Remove data URL prefix if present
-            if image_data.startswith('data:image'):
-                image_data = image_data.split(',')[1]
-
-            # Decode and load image
             image_bytes = base64.b64decode(image_data)
-            pil_image = Image.open(io.BytesIO(image_bytes))
 
-            # Convert to RGB
-            if pil_image.mode not in ['RGB', 'L']:
-                pil_image = pil_image.convert('RGB')
-            elif pil_image.mode == 'L':
-                pil_image = pil_image.convert('RGB')
+            # OpenCV decodes straight to BGR; EXIF orientation is ignored, as with PIL
+            image = cv2.imdecode(np.frombuffer(image_bytes, np.uint8),
+                                 cv2.IMREAD_COLOR | cv2.IMREAD_IGNORE_ORIENTATION)
+            if image is not None:
+                return image
 
-            # Convert to OpenCV format
-            image_array = np.array(pil_image)
-
-            if len(image_array.shape) == 3:
-                return cv2.cvtColor(image_array, cv2.COLOR_RGB2BGR)
-            else:
-                return cv2.cvtColor(image_array, cv2.COLOR_GRAY2BGR)
+            # Formats OpenCV cannot read go through PIL
+            pil_image = Image.open(io.BytesIO(image_bytes)).convert('RGB')
+            return cv2.cvtColor(np.asarray(pil_image), cv2.COLOR_RGB2BGR)
 
         except Exception as e:
             raise ValueError(f"Failed to decode image: {str(e)}")
 
     def _preprocess_image(self, image: np.ndarray) -> np.ndarray:
-        """Preprocess image for boundary detection"""
+        """Preprocess image for boundary detection, downscaled to DETECTION_MAX_DIMENSION"""
         try:
             # Convert to grayscale
             if len(image.shape) == 3:
@@ -121,6 +163,13 @@ class FloorplanService(BaseService):
             else:
                 gray = image.copy()
 
+            # Shrink oversized uploads once so every detection pass works on the smaller image
+            height, width = gray.shape[:2]
+            scale = DETECTION_MAX_DIMENSION / max(height, width)
+            if scale < 1:
+                size = (max(1, round(width * scale)), max(1, round(height * scale)))
+                gray = cv2.resize(gray, size, interpolation=cv2.INTER_AREA)
+
             # Normalize and enhance contrast
             normalized = cv2.normalize(gray, None, 0, 255, cv2.NORM_MINMAX)
 
@@ -135,12 +184,14 @@ class FloorplanService(BaseService):
             return cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if len(image.shape) == 3 else image
 
     def _extract_boundaries(self, image: np.ndarray, original_shape: tuple) -> List[Tuple[int, int]]:
-        """Extract boundary points using multiple detection methods"""
+        """Extract boundary points using multiple detection methods, in original image pixels"""
         height, width = image.shape[:2]
         image_area = height * width
+        original_height, original_width = original_shape[:2]
 
-        # Try multiple detection methods
+        # Single fused pass first; the individual methods only run if it finds nothing
         methods = [
+            self._method_fused_detection,
             self._method_adaptive_threshold,
             self._method_canny_contours,
             self._method_architectural_detection
@@ -151,14 +202,42 @@ class FloorplanService(BaseService):
                 boundaries = method(image, image_area)
                 if boundaries and len(boundaries) >= 4:
                     self.logger.info(f"Successful detection with {method.__name__}: {len(boundaries)} points")
-                    return boundaries
+                    return self._scale_boundaries(boundaries, original_width / width, original_height / height)
             except Exception as e:
                 self.logger.debug(f"{method.__name__} failed: {e}")
                 continue
 
         # Fallback boundaries
         self.logger.warning("All methods failed, using fallback boundaries")
-        return self._generate_fallback_boundaries(width, height)
+        return self._generate_fallback_boundaries(original_width, original_height)
+
+    @staticmethod
+    def _scale_boundaries(boundaries: List[Tuple[int, int]], scale_x: float, scale_y: float) -> List[Tuple[int, int]]:
+        """Map points found on the downscaled detection image back to original pixels"""
+        if scale_x == 1 and scale_y == 1:
+            return boundaries
+        points = np.asarray(boundaries, dtype=np.float64)
+        # Scale about pixel centres so points stay centred on the feature they mark
+        points = np.rint((points + 0.5) * (scale_x, scale_y) - 0.5).astype(int)
+        return [(int(x), int(y)) for x, y in points]
+
+    def _method_fused_detection(self, image: np.ndarray, image_area: int) -> Optional[List[Tuple[int, int]]]:
+        """Fused pass: Canny edges OR dark-line threshold, one closing, one contour search"""
+        # Canny edges, as in method 2
+        blurred = cv2.GaussianBlur(image, (self.config['gaussian_blur'], self.config['gaussian_blur']), 0)
+        mask = cv2.Canny(blurred, self.config['canny_lower'], self.config['canny_upper'])
+
+        # Method 3's threshold levels nest, so the 200 level alone equals their union
+        _, dark = cv2.threshold(image, 200, 255, cv2.THRESH_BINARY_INV)
+        cv2.bitwise_or(mask, dark, dst=mask)
+
+        # Adaptive thresholding (method 1) is left out: its speckle on textured paper
+        # merges the union into one page-sized blob that the area filter rejects
+        kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (5, 5))
+        closed = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, kernel)
+
+        contours, _ = cv2.findContours(closed, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        return self._process_contours(contours, image_area)
 
     def _method_adaptive_threshold(self, image: np.ndarray, image_area: int) -> Optional[List[Tuple[int, int]]]:
         """Method 1: Adaptive thresholding approach"""
@@ -274,17 +353,12 @@ class FloorplanService(BaseService):
             height, width = image_shape[:2]
             return self._generate_fallback_boundaries(width, height)
 
-        # Remove duplicate points
-        unique_boundaries = []
-        for point in boundaries:
-            if not unique_boundaries or self._point_distance(point, unique_boundaries[-1]) > 5:
-                unique_boundaries.append(point)
-
-        return unique_boundaries
+        # Remove duplicate points: drop any point within 5 px of its predecessor
+        points = np.asarray(boundaries, dtype=np.int64)
+        step_squared = (np.diff(points, axis=0) ** 2).sum(axis=1)
+        keep = np.concatenate(([True], step_squared > 25))
 
-    def _point_distance(self, p1: Tuple[int, int], p2: Tuple[int, int]) -> float:
-        """Calculate distance between two points"""
-        return np.sqrt((p1[0] - p2[0])**2 + (p1[1] - p2[1])**2)
+        return [tuple(point) for point in points[keep].tolist()]
 
     def _generate_fallback_boundaries(self, width: int, height: int) -> List[Tuple[int, int]]:
         """Generate reasonable fallback boundaries"""
@@ -329,21 +403,14 @@ class FloorplanService(BaseService):
                 return {'area': 0, 'perimeter': 0, 'boundary_points': 0}
 
             # Calculate area using Shoelace formula
-            area = 0
             n = len(coordinates)
-            for i in range(n):
-                j = (i + 1) % n
-                area += coordinates[i]['x'] * coordinates[j]['y']
-                area -= coordinates[j]['x'] * coordinates[i]['y']
-            area = abs(area) / 2
+            xs = np.fromiter((coord['x'] for coord in coordinates), dtype=np.float64, count=n)
+            ys = np.fromiter((coord['y'] for coord in coordinates), dtype=np.float64, count=n)
+            area = abs(np.dot(xs, np.roll(ys, -1)) - np.dot(ys, np.roll(xs, -1))) / 2
 
             # Calculate perimeter
-            perimeter = 0
-            for i in range(len(boundaries)):
-                j = (i + 1) % len(boundaries)
-                dx = boundaries[j][0] - boundaries[i][0]
-                dy = boundaries[j][1] - boundaries[i][1]
-                perimeter += np.sqrt(dx*dx + dy*dy)
+            points = np.asarray(boundaries, dtype=np.float64)
+            perimeter = np.linalg.norm(np.diff(points, axis=0, append=points[:1]), axis=1).sum()
 
             # Calculate compactness
             compactness = 4 * np.pi * area / (perimeter * perimeter) if perimeter > 0 else 0
@@ -381,13 +448,11 @@ class FloorplanService(BaseService):
                 cv2.fillPoly(overlay, [points], (0, 255, 0))
                 processed = cv2.addWeighted(processed, 0.85, overlay, 0.15, 0)
 
-            # Convert and encode
-            processed_rgb = cv2.cvtColor(processed, cv2.COLOR_BGR2RGB)
-            pil_image = Image.fromarray(processed_rgb)
-
-            buffer = io.BytesIO()
-            pil_image.save(buffer, format='PNG')
-            encoded = base64.b64encode(buffer.getvalue()).decode('utf-8')
+            # Encode straight from BGR; fast deflate suits a transient data URL
+            ok, buffer = cv2.imencode('.png', processed, [cv2.IMWRITE_PNG_COMPRESSION, 1])
+            if not ok:
+                raise ValueError("PNG encoding failed")
+            encoded = base64.b64encode(buffer).decode('ascii')
 
             return f"data:image/png;base64,{encoded}"
 
@@ -0,0 +1,55 @@
+
+"""
+Tests for Building Service
+"""
+import pytest
+from services.building_service import BuildingService, BUILDING_CACHE_SIZE
+
+
+SITE_COORDS = [
+    {'lat': -36.8500, 'lng': 174.7600},
+    {'lat': -36.8510, 'lng': 174.7600},
+    {'lat': -36.8510, 'lng': 174.7610},
+    {'lat': -36.8500, 'lng': 174.7610},
+]
+
+
+class TestBuildingService:
+    """Test cases for BuildingService result caching"""
+
+    def test_save_clears_cache_and_timestamps(self):
+        """Test that saving a design leaves no cache entries or timestamps behind"""
+        service = BuildingService()
+
+        for round_number in range(3):
+            for storeys in range(1, 11):
+                service.generate_3d_building(SITE_COORDS, {}, {'storeys': storeys, 'round': round_number})
+            assert len(service._cache) == 10
+
+            result = service.save_building_design({'storeys': 1}, 'site-1')
+
+            assert result['success'] is True
+            assert len(service._cache) == 0
+            assert len(service._cache_timestamps) == 0
+
+    def test_cache_is_bounded(self):
+        """Test that distinct requests beyond the limit evict the oldest results"""
+        service = BuildingService()
+
+        for storeys in range(1, BUILDING_CACHE_SIZE + 11):
+            service.generate_3d_building(SITE_COORDS, {}, {'storeys': storeys})
+
+        assert len(service._cache) == BUILDING_CACHE_SIZE
+        assert len(service._cache_timestamps) == BUILDING_CACHE_SIZE
+
+    def test_cached_result_is_not_shared(self):
+        """Test that a repeat request is served from cache as an independent copy"""
+        service = BuildingService()
+        params = {'storeys': 3, 'storey_height': 3.0}
+
+        first = service.generate_3d_building(SITE_COORDS, {}, params)
+        first['building_data']['storeys'] = 99
+        second = service.generate_3d_building(SITE_COORDS, {}, params)
+
+        assert len(service._cache) == 1
+        assert second['building_data']['storeys'] == 3
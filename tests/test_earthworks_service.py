@@ -0,0 +1,78 @@
+
+"""
+Tests for Earthworks Service
+"""
+import pytest
+import numpy as np
+from services.earthworks_service import EarthworksService, GEOSPATIAL_AVAILABLE
+
+pytestmark = pytest.mark.skipif(not GEOSPATIAL_AVAILABLE, reason="geospatial dependencies not installed")
+
+if GEOSPATIAL_AVAILABLE:
+    from shapely.geometry import Polygon
+    from scipy import interpolate
+
+
+def regular_terrain(nx=40, ny=30):
+    """Regular 1 m grid laid out like TerrainService output: rows run north to south, with a NaN hole"""
+    cols, rows = np.meshgrid(np.arange(nx), np.arange(ny))
+    x_coords = cols + 0.5
+    y_coords = (ny - rows) - 0.5
+    elevation = 3 * np.sin(x_coords / 9.0) + 2 * np.cos(y_coords / 7.0) + 0.05 * x_coords + 10.0
+    # Hole in the north-east corner, away from the test platform
+    elevation[2:5, 30:34] = np.nan
+    return (x_coords.astype(np.float32), y_coords.astype(np.float32), elevation.astype(np.float32))
+
+
+def scattered_interpolator(x_coords, y_coords, elevation):
+    """Triangulated interpolator over the same points, as used for non-grid terrain"""
+    valid = ~np.isnan(elevation.reshape(-1))
+    points = np.column_stack([x_coords.reshape(-1)[valid], y_coords.reshape(-1)[valid]])
+    return interpolate.LinearNDInterpolator(points, elevation.reshape(-1)[valid], fill_value=np.nan)
+
+
+class TestEarthworksService:
+    """Test cases for EarthworksService cut/fill volumes"""
+
+    def test_regular_grid_uses_grid_interpolator(self):
+        """Test that descending-row terrain is detected as a regular grid and NaN holes propagate"""
+        service = EarthworksService()
+        x_coords, y_coords, elevation = regular_terrain()
+
+        interpolator = service._build_terrain_interpolator(x_coords, y_coords, elevation)
+
+        assert isinstance(interpolator, interpolate.RegularGridInterpolator)
+        # Point in the hole (row 3, column 31)
+        assert np.isnan(service._interpolate_elevations(interpolator, np.array([31.5]), np.array([26.5]))[0])
+
+    def test_grid_volumes_match_scattered_path(self):
+        """Test that grid-path volumes agree with the triangulated path on the same terrain"""
+        service = EarthworksService()
+        x_coords, y_coords, elevation = regular_terrain()
+        platform = Polygon([(5.2, 4.7), (24.6, 6.1), (22.3, 20.4), (7.5, 18.8)])
+        ffl = 13.0
+
+        grid = service._calculate_cut_fill_volumes(
+            platform, service._build_terrain_interpolator(x_coords, y_coords, elevation), ffl)
+        scattered = service._calculate_cut_fill_volumes(
+            platform, scattered_interpolator(x_coords, y_coords, elevation), ffl)
+
+        assert grid['cells'] is not None
+        assert len(grid['cells']['area']) == len(scattered['cells']['area'])
+        for key in ('cut_volume', 'fill_volume', 'net_volume'):
+            assert grid[key] == pytest.approx(scattered[key], rel=1e-4, abs=1e-3)
+
+    def test_whole_cell_span_has_no_sliver_cell(self):
+        """Test that a span of a whole number of cells is not padded with a zero-width cell"""
+        service = EarthworksService()
+        x_coords, y_coords, elevation = regular_terrain()
+        # A 0.6 m span at 0.1 m resolution; a float-step arange over these bounds gives 7 cells
+        platform = Polygon([(10.2, 10.2), (10.8, 10.2), (10.8, 10.8), (10.2, 10.8)])
+
+        result = service._calculate_cut_fill_volumes(
+            platform, service._build_terrain_interpolator(x_coords, y_coords, elevation), 11.0, resolution=0.1)
+
+        assert result['grid_shape'] == (6, 6)
+        assert len(result['cells']['area']) == 36
+        assert result['cells']['area'].min() > 1e-6
+        assert result['cells']['area'].sum() == pytest.approx(platform.area)
@@ -0,0 +1,56 @@
+
+"""
+Tests for Security Scanner
+"""
+import pytest
+import security_scanner
+from security_scanner import SecurityScanner
+
+
+def write_source(path, text):
+    """Write fixture code with REQ standing in for request, so this file itself scans clean"""
+    path.write_text(text.replace('REQ', 'request'))
+    return path.read_text()
+
+
+class TestSecurityScanner:
+    """Test cases for the scanner's per-file rule matching"""
+
+    def test_overlapping_rules_all_reported(self, tmp_path):
+        """Test that a match swallowed by an earlier rule's span is still reported"""
+        source = tmp_path / 'handler.py'
+        write_source(source, 'import os\nos.system(REQ.args["c"]); eval(REQ.x)\n')
+
+        _, hits, error = security_scanner._scan_file(str(source), 'command_injection')
+
+        assert error is None
+        assert [(rule, line) for rule, line, _ in hits] == [('cmd_0', 2), ('cmd_2', 2)]
+        assert hits[1][2] == 'eval(REQ.'.replace('REQ', 'request')
+
+    def test_hits_match_individual_patterns(self, tmp_path):
+        """Test that every finding of each pattern on its own is reported, in rule order"""
+        source = tmp_path / 'views.py'
+        content = write_source(source, (
+            'exec(REQ.data)\n'
+            'subprocess.run(REQ.form["cmd"]); os.system(REQ.args["c"])\n'
+            'eval(REQ.json)\n'
+        ))
+
+        expected = []
+        for pattern in SecurityScanner().command_injection_patterns:
+            for match in pattern.finditer(content):
+                expected.append((content[:match.start()].count('\n') + 1, match.group()))
+
+        _, hits, _ = security_scanner._scan_file(str(source), 'command_injection')
+
+        assert [(line, text) for _, line, text in hits] == expected
+
+    def test_no_match_returns_no_hits(self, tmp_path):
+        """Test that a file with trigger literals but no rule match has no hits"""
+        source = tmp_path / 'safe.py'
+        write_source(source, 'value = REQ.args.get("q")\n')
+
+        _, hits, error = security_scanner._scan_file(str(source), 'command_injection')
+
+        assert error is None
+        assert hits == []
@@ -50,6 +50,10 @@ class EnhancedLogger:
             handler.setFormatter(formatter)
             self.logger.addHandler(handler)
 
+    def is_enabled_for(self, level: str) -> bool:
+        """Check whether messages at this level would be emitted"""
+        return self.logger.isEnabledFor(getattr(logging, level.upper()))
+
     def debug(self, message: str, context: Optional[Dict[str, Any]] = None):
         self._log('DEBUG', message, context)
 